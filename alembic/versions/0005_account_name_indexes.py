@@ -0,0 +1,25 @@
+"""index employee_name on account tables
+
+Revision ID: 0005_account_name_indexes
+Revises: 0004_add_lookup_payload
+Create Date: 2026-10-16 00:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0005_account_name_indexes"
+down_revision = "0004_add_lookup_payload"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_myidtravel_accounts_employee_name", "myidtravel_accounts", ["employee_name"], unique=False)
+    op.create_index(
+        "ix_stafftraveler_accounts_employee_name", "stafftraveler_accounts", ["employee_name"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stafftraveler_accounts_employee_name", table_name="stafftraveler_accounts")
+    op.drop_index("ix_myidtravel_accounts_employee_name", table_name="myidtravel_accounts")
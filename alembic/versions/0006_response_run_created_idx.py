@@ -0,0 +1,33 @@
+"""index bot responses by run_id and created_at
+
+Revision ID: 0006_response_run_created_idx
+Revises: 0005_account_name_indexes
+Create Date: 2026-10-16 00:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0006_response_run_created_idx"
+down_revision = "0005_account_name_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_standby_bot_responses_run_id_created_at",
+        "standby_bot_responses",
+        ["run_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_lookup_bot_responses_run_id_created_at",
+        "lookup_bot_responses",
+        ["run_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lookup_bot_responses_run_id_created_at", table_name="lookup_bot_responses")
+    op.drop_index("ix_standby_bot_responses_run_id_created_at", table_name="standby_bot_responses")
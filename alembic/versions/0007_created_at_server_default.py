@@ -0,0 +1,46 @@
+"""fill created_at with a server-side default
+
+Revision ID: 0007_created_at_server_default
+Revises: 0006_response_run_created_idx
+Create Date: 2026-10-16 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0007_created_at_server_default"
+down_revision = "0006_response_run_created_idx"
+branch_labels = None
+depends_on = None
+
+TABLES = (
+    "runs",
+    "standby_bot_responses",
+    "lookup_bot_responses",
+    "airlines",
+    "myidtravel_accounts",
+    "stafftraveler_accounts",
+)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "created_at",
+                existing_type=sa.DateTime(),
+                existing_nullable=False,
+                server_default=sa.func.now(),
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "created_at",
+                existing_type=sa.DateTime(),
+                existing_nullable=False,
+                server_default=None,
+            )
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import Browser, BrowserContext, Playwright, Route, async_playwright
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+_BLOCKED_URL_RE = re.compile("|".join(re.escape(pattern) for pattern in config.BLOCKED_URL_PATTERNS))
+
+
+async def _abort(route: Route) -> None:
+    await route.abort()
+
+
+async def _block_resource_type(route: Route) -> None:
+    if route.request.resource_type in config.BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _close_quietly(context: BrowserContext) -> None:
+    try:
+        await context.close()
+    except Exception:
+        logger.debug("Context close failed", exc_info=True)
+
+
+class BrowserPool:
+    """
+    Keeps one Playwright driver and one Chromium per launch configuration alive,
+    handing out a fresh BrowserContext per job.
+    """
+
+    def __init__(self) -> None:
+        self._pw: Playwright | None = None
+        self._browsers: dict[tuple[bool, tuple[str, ...]], Browser] = {}
+        self._lock = asyncio.Lock()
+        self._pending_cleanups: set[asyncio.Task] = set()
+
+    async def _get_browser(self, headless: bool, args: tuple[str, ...]) -> Browser:
+        key = (headless, args)
+        async with self._lock:
+            browser = self._browsers.get(key)
+            if browser and browser.is_connected():
+                return browser
+            if self._pw is None:
+                self._pw = await async_playwright().start()
+            launch_args = list(dict.fromkeys((*config.CHROMIUM_LAUNCH_ARGS, *args)))
+            logger.info("Launching Chromium headless=%s args=%s", headless, launch_args)
+            browser = await self._pw.chromium.launch(headless=headless, args=launch_args)
+            self._browsers[key] = browser
+            return browser
+
+    async def get_context(
+        self,
+        site: str,
+        headless: bool = True,
+        args: tuple[str, ...] = (),
+        storage_state: Path | None = None,
+        block_resources: bool = True,
+        **context_kwargs: Any,
+    ) -> BrowserContext:
+        """
+        Return a new context on the shared browser, hydrated from storage_state when it exists.
+        Analytics hosts, and any BLOCKED_RESOURCE_TYPES, are aborted unless block_resources is False.
+        """
+        browser = await self._get_browser(headless, tuple(args))
+        if storage_state and storage_state.exists():
+            context_kwargs["storage_state"] = str(storage_state)
+        logger.debug("Opening %s context", site)
+        context = await browser.new_context(**context_kwargs)
+        if block_resources and config.BLOCKED_URL_PATTERNS:
+            await context.route(_BLOCKED_URL_RE, _abort)
+        if block_resources and config.BLOCKED_RESOURCE_TYPES:
+            # Resource types can only be checked per request, so this route intercepts everything.
+            await context.route("**/*", _block_resource_type)
+        return context
+
+    async def release(self, context: BrowserContext, wait: bool = False) -> None:
+        """
+        Close a context, in the background unless wait is set.
+        """
+        if wait:
+            await _close_quietly(context)
+            return
+        task = asyncio.create_task(_close_quietly(context))
+        self._pending_cleanups.add(task)
+        task.add_done_callback(self._pending_cleanups.discard)
+
+    async def shutdown(self) -> None:
+        if self._pending_cleanups:
+            await asyncio.gather(*self._pending_cleanups, return_exceptions=True)
+        async with self._lock:
+            for browser in self._browsers.values():
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            self._browsers.clear()
+            if self._pw is not None:
+                try:
+                    await self._pw.stop()
+                except Exception:
+                    pass
+                self._pw = None
+
+
+browser_pool = BrowserPool()
+
+
+async def get_context(site: str, **kwargs: Any) -> BrowserContext:
+    return await browser_pool.get_context(site, **kwargs)
+
+
+async def release(context: BrowserContext, wait: bool = False) -> None:
+    await browser_pool.release(context, wait=wait)
+
+
+async def shutdown() -> None:
+    await browser_pool.shutdown()
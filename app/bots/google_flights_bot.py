@@ -1,6 +1,5 @@
 import argparse
 import asyncio
-import json
 import logging
 import re
 import sys
@@ -9,6 +8,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
 from playwright.async_api import TimeoutError as PlaywrightTimeout
 from playwright.async_api import async_playwright
 
@@ -23,6 +23,21 @@ from app.utils import to_minutes
 # Output path for captured Google Flights results.
 OUTPUT_PATH = Path("json/google_flights_results.json")
 MAX_ADULTS = 9
+# Role-name and label patterns, compiled once instead of on every page interaction.
+_STOPS_RE = re.compile("Stops", re.I)
+_NONSTOP_RE = re.compile("Nonstop", re.I)
+_DONE_RE = re.compile("Done", re.I)
+_AIRLINES_RE = re.compile("Airlines", re.I)
+_DONE_APPLY_RE = re.compile("Done|Close|Save|Apply", re.I)
+_SEARCH_RE = re.compile("Search", re.I)
+_TRIP_TYPE_RE = re.compile("Round trip|One way|Multi-city", re.I)
+_ADD_FLIGHT_RE = re.compile("Add flight", re.I)
+_PASSENGERS_RE = re.compile("passenger|traveler|adult", re.I)
+_DONE_CLOSE_RE = re.compile("Done|Close|Save", re.I)
+_CABIN_CLASS_RE = re.compile("Economy|Business|First|Class", re.I)
+_FLIGHT_NUMBER_IN_TEXT_RE = re.compile(r"\b[A-Z]{1,3}\s?\d{1,4}\b", re.I)
+_TOP_FLIGHTS_RE = re.compile(r"top flight", re.I)
+_OTHER_FLIGHTS_RE = re.compile(r"other flight", re.I)
 logger = logging.getLogger(__name__)
 if not logging.getLogger().handlers:
     logging.basicConfig(
@@ -138,7 +153,7 @@ async def _apply_nonstop_filter(page) -> None:
     """
     Try to enable the Nonstop filter if the toolbar is available.
     """
-    stops_button = page.get_by_role("button", name=re.compile("Stops", re.I))
+    stops_button = page.get_by_role("button", name=_STOPS_RE)
     if not await stops_button.count():
         return
 
@@ -148,14 +163,14 @@ async def _apply_nonstop_filter(page) -> None:
     except Exception:
         return
 
-    nonstop_option = page.get_by_role("radio", name=re.compile("Nonstop", re.I))
+    nonstop_option = page.get_by_role("radio", name=_NONSTOP_RE)
     if await nonstop_option.count():
         try:
             await nonstop_option.click()
         except Exception:
             pass
 
-    done_button = page.get_by_role("button", name=re.compile("Done", re.I))
+    done_button = page.get_by_role("button", name=_DONE_RE)
     if await done_button.count():
         try:
             await done_button.click()
@@ -176,7 +191,7 @@ async def _apply_airline_filter(page, airline_names: set[str]) -> None:
     if not airline_names:
         return
 
-    airlines_button = page.get_by_role("button", name=re.compile("Airlines", re.I))
+    airlines_button = page.get_by_role("button", name=_AIRLINES_RE)
     if not await airlines_button.count():
         return
 
@@ -212,7 +227,7 @@ async def _apply_airline_filter(page, airline_names: set[str]) -> None:
             except Exception:
                 pass
 
-    done_button = page.get_by_role("button", name=re.compile("Done|Close|Save|Apply", re.I))
+    done_button = page.get_by_role("button", name=_DONE_APPLY_RE)
     if await done_button.count():
         try:
             await done_button.click()
@@ -287,7 +302,7 @@ def _seat_class_key(seat_class: str) -> str:
 def _extract_flight_numbers_from_text(text: str | None) -> list[str]:
     values: list[str] = []
     seen: set[str] = set()
-    for match in re.findall(r"\b[A-Z]{1,3}\s?\d{1,4}\b", text or "", flags=re.I):
+    for match in _FLIGHT_NUMBER_IN_TEXT_RE.findall(text or ""):
         normalized = _normalize_flight_number(match)
         if normalized and normalized not in seen:
             seen.add(normalized)
@@ -386,7 +401,34 @@ def _google_item_variants(item: dict[str, Any]) -> set[str]:
     return variants
 
 
-def _find_best_google_match(flight: dict[str, Any], section_flights: list[dict[str, Any]]) -> dict[str, Any] | None:
+_GoogleItemFeatures = tuple[dict[str, Any], str, str, int | None, set[str], int, str]
+
+
+def _google_item_features(section_flights: list[dict[str, Any]]) -> list[_GoogleItemFeatures]:
+    """
+    Derive the per-item match inputs once per scrape instead of once per (flight, item) pair.
+    """
+    return [
+        (
+            item,
+            (item.get("origin") or "").strip().upper(),
+            (item.get("destination") or "").strip().upper(),
+            _parse_stops_count(item.get("stops")),
+            _google_item_variants(item),
+            to_minutes(item.get("duration")),
+            (item.get("airline") or "").strip().lower(),
+        )
+        for item in section_flights
+    ]
+
+
+def _find_best_google_match(
+    flight: dict[str, Any],
+    section_flights: list[dict[str, Any]],
+    features: list[_GoogleItemFeatures] | None = None,
+) -> dict[str, Any] | None:
+    if features is None:
+        features = _google_item_features(section_flights)
     candidates = _flight_number_candidates(flight)
     target_origin = (flight.get("departure") or "").strip().upper()
     target_destination = (flight.get("arrival") or "").strip().upper()
@@ -399,9 +441,7 @@ def _find_best_google_match(flight: dict[str, Any], section_flights: list[dict[s
     best_has_overlap = False
     best_confident_connection = False
 
-    for item in section_flights:
-        item_origin = (item.get("origin") or "").strip().upper()
-        item_destination = (item.get("destination") or "").strip().upper()
+    for item, item_origin, item_destination, item_stops, item_variants, item_duration, airline in features:
         route_match = bool(
             target_origin
             and target_destination
@@ -409,10 +449,8 @@ def _find_best_google_match(flight: dict[str, Any], section_flights: list[dict[s
             and item_destination == target_destination
         )
 
-        item_stops = _parse_stops_count(item.get("stops"))
         stops_match = item_stops is not None and item_stops == target_stops
 
-        item_variants = _google_item_variants(item)
         overlap = item_variants & candidates
 
         score = 0
@@ -423,7 +461,6 @@ def _find_best_google_match(flight: dict[str, Any], section_flights: list[dict[s
         if overlap:
             score += 100 + len(overlap)
 
-        item_duration = to_minutes(item.get("duration"))
         duration_close = False
         if target_duration != 1440 and item_duration != 1440:
             diff = abs(item_duration - target_duration)
@@ -437,7 +474,6 @@ def _find_best_google_match(flight: dict[str, Any], section_flights: list[dict[s
             elif duration_close:
                 score += 2
 
-        airline = (item.get("airline") or "").strip().lower()
         if airline and target_airlines and any(name in airline or airline in name for name in target_airlines):
             score += 5
 
@@ -866,9 +902,9 @@ async def _scrape_results(
                 if not await items.count():
                     items = sec.locator("li[role='listitem']")
 
-                if re.search(r"top flight", label, re.I):
+                if _TOP_FLIGHTS_RE.search(label):
                     found_top = items
-                elif re.search(r"other flight", label, re.I):
+                elif _OTHER_FLIGHTS_RE.search(label):
                     found_other = items
                 elif found_top is None and await items.count():
                     found_top = items
@@ -927,7 +963,7 @@ async def update_selectable_flights(
     async with async_playwright() as p:
         if progress_cb:
             await progress_cb(5, "launching")
-        browser = await p.chromium.launch(headless=headless)
+        browser = await p.chromium.launch(headless=headless, args=list(config.CHROMIUM_LAUNCH_ARGS))
         context = await browser.new_context()
         page = await context.new_page()
 
@@ -997,7 +1033,7 @@ async def update_selectable_flights(
 
             await _fill_basic_form(page, origin, destination, date_val, "")
 
-            search_btn = page.get_by_role("button", name=re.compile("Search", re.I)).first
+            search_btn = page.get_by_role("button", name=_SEARCH_RE).first
             if await search_btn.count():
                 try:
                     await search_btn.click()
@@ -1021,6 +1057,7 @@ async def update_selectable_flights(
             adults = MAX_ADULTS
             while True:
                 section_flights = await _scrape_sections_once(page, limit=limit, seats_available=str(adults))
+                section_features = _google_item_features(section_flights)
 
                 for flight in flights:
                     if not isinstance(flight, dict):
@@ -1029,7 +1066,7 @@ async def update_selectable_flights(
                     gf_seats = seats.get("google_flights") or {}
                     if gf_seats.get(seat_key):
                         continue
-                    matched = _find_best_google_match(flight, section_flights)
+                    matched = _find_best_google_match(flight, section_flights, section_features)
                     if matched:
                         gf_seats[seat_key] = str(adults)
                         seats["google_flights"] = gf_seats
@@ -1101,7 +1138,7 @@ async def _switch_trip_type(page, desired: str) -> None:
     form = page.locator(config.GF_FORM_CONTAINER).first
     toggle = form.locator(config.GF_TRIP_TYPE_TOGGLE).first
     if not await toggle.count():
-        toggle = page.get_by_role("button", name=re.compile("Round trip|One way|Multi-city", re.I))
+        toggle = page.get_by_role("button", name=_TRIP_TYPE_RE)
     if not await toggle.count():
         return
     try:
@@ -1147,7 +1184,7 @@ async def _ensure_leg_rows(page, count: int) -> None:
     form = page.locator(config.GF_FORM_CONTAINER).first
     add_btn = form.locator(config.GF_ADD_FLIGHT_BUTTON).first
     if not await add_btn.count():
-        add_btn = page.get_by_role("button", name=re.compile("Add flight", re.I))
+        add_btn = page.get_by_role("button", name=_ADD_FLIGHT_RE)
     for _ in range(6):  # cap to avoid runaway loop
         fields_container = page.locator(config.GF_FIELDS_CONTAINER).first
         if not await fields_container.count():
@@ -1246,7 +1283,7 @@ async def _fill_leg_row(page, idx: int, origin: str, destination: str, date_str:
                 if date_str:
                     await date_field.type(_iso_date(date_str))
                     await date_field.press("Enter")
-                    done_btn = page.get_by_role("button", name=re.compile("Done", re.I)).first
+                    done_btn = page.get_by_role("button", name=_DONE_RE).first
                     if await done_btn.count():
                         try:
                             await done_btn.click()
@@ -1342,10 +1379,16 @@ async def _fill_simple_field(locator, value: str) -> None:
             except Exception:
                 pass
 
-            # Type the value
+            # Insert all but the last character at once; one real keystroke fires the autocomplete query.
             logger.debug("Typing value: %s", value)
-            await page_obj.keyboard.type(value, delay=80)
-            await page_obj.wait_for_timeout(1500)  # Longer wait for autocomplete
+            await page_obj.keyboard.insert_text(value[:-1])
+            await page_obj.keyboard.type(value[-1:])
+            try:
+                await page_obj.wait_for_selector(
+                    f'li[role="option"][data-code="{value.strip().upper()}"]', state="visible", timeout=3000
+                )
+            except PlaywrightTimeout:
+                pass
 
         except Exception as e:
             logger.debug("Error during input: %s", e)
@@ -1520,7 +1563,7 @@ async def _fill_basic_form(
             if depart_date:
                 await depart_field.type(_iso_date(depart_date))
                 await depart_field.press("Enter")
-                done_btn = page.get_by_role("button", name=re.compile("Done", re.I)).first
+                done_btn = page.get_by_role("button", name=_DONE_RE).first
                 if await done_btn.count():
                     try:
                         await done_btn.click()
@@ -1558,7 +1601,7 @@ async def _fill_basic_form(
                 await ret_field.fill("")
                 await ret_field.type(_iso_date(return_date))
                 await ret_field.press("Enter")
-                done_btn = page.get_by_role("button", name=re.compile("Done", re.I)).first
+                done_btn = page.get_by_role("button", name=_DONE_RE).first
                 if await done_btn.count():
                     try:
                         await done_btn.click()
@@ -1600,7 +1643,7 @@ async def scrape_basic_form(
         leg.get("return_date", ""),
     )
 
-    search_btn = page.get_by_role("button", name=re.compile("Search", re.I))
+    search_btn = page.get_by_role("button", name=_SEARCH_RE)
     if await search_btn.count():
         try:
             await search_btn.click()
@@ -1645,7 +1688,7 @@ async def _max_adults(page) -> None:
 
     pax_toggle = form.locator(config.GF_PASSENGER_TOGGLE).first
     if not await pax_toggle.count():
-        pax_toggle = page.get_by_role("button", name=re.compile("passenger|traveler|adult", re.I))
+        pax_toggle = page.get_by_role("button", name=_PASSENGERS_RE)
 
     if not await pax_toggle.count():
         return
@@ -1670,7 +1713,7 @@ async def _max_adults(page) -> None:
             break
 
     # Close the dialog if a close/done exists; otherwise press Escape.
-    done = page.get_by_role("button", name=re.compile("Done|Close|Save", re.I))
+    done = page.get_by_role("button", name=_DONE_CLOSE_RE)
     if await done.count():
         try:
             await done.click()
@@ -1694,7 +1737,7 @@ async def _decrement_adults(page, current: int) -> int:
 
     pax_toggle = form.locator(config.GF_PASSENGER_TOGGLE).first
     if not await pax_toggle.count():
-        pax_toggle = page.get_by_role("button", name=re.compile("passenger|traveler|adult", re.I))
+        pax_toggle = page.get_by_role("button", name=_PASSENGERS_RE)
 
     if not await pax_toggle.count():
         return current
@@ -1724,7 +1767,7 @@ async def _decrement_adults(page, current: int) -> int:
     except Exception:
         pass
 
-    done = page.get_by_role("button", name=re.compile("Done|Close|Save", re.I))
+    done = page.get_by_role("button", name=_DONE_CLOSE_RE)
     if await done.count():
         try:
             await done.click()
@@ -1747,7 +1790,7 @@ async def _select_seat_class(page, seat_class: str) -> None:
         form = page
     class_toggle = form.locator(config.GF_CLASS_TOGGLE).first
     if not await class_toggle.count():
-        class_toggle = page.get_by_role("button", name=re.compile("Economy|Business|First|Class", re.I))
+        class_toggle = page.get_by_role("button", name=_CABIN_CLASS_RE)
     if not await class_toggle.count():
         return
 
@@ -1807,7 +1850,7 @@ async def run(
     async with async_playwright() as p:
         if progress_cb:
             await progress_cb(5, "launching")
-        browser = await p.chromium.launch(headless=headless)
+        browser = await p.chromium.launch(headless=headless, args=list(config.CHROMIUM_LAUNCH_ARGS))
         context = await browser.new_context()
         page = await context.new_page()
 
@@ -1859,7 +1902,7 @@ async def run(
                 leg.get("return_date", ""),
             )
 
-        search_btn = page.get_by_role("button", name=re.compile("Search", re.I)).first
+        search_btn = page.get_by_role("button", name=_SEARCH_RE).first
         if await search_btn.count():
             try:
                 await search_btn.click()
@@ -1924,7 +1967,7 @@ async def run(
 
     if output:
         output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_text(json.dumps(results, indent=2))
+        output.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
         logger.info("Wrote %s leg result(s) to %s", len(results), output)
 
     if progress_cb:
@@ -1966,4 +2009,9 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -1,22 +1,26 @@
 import argparse
 import asyncio
-import json
+import functools
+import hashlib
 import logging
 import os
 import sys
+import time
 from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
+import orjson
 from dotenv import load_dotenv
+from playwright.async_api import Locator
 from playwright.async_api import TimeoutError as PlaywrightTimeout
-from playwright.async_api import async_playwright
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 if str(BASE_DIR) not in sys.path:
     sys.path.append(str(BASE_DIR))
 
 from app import config
+from app.bots import browser_pool
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -28,6 +32,24 @@ if not logging.getLogger().handlers:
 
 _notify_callback: Callable[[str], Awaitable[None]] | None = None
 
+FLIGHT_TYPE_LABELS = {
+    "one-way": "One Way",
+    "round-trip": "Round Trip",
+    "multiple-legs": "Multiple Legs",
+}
+MODAL_CLOSE_SELECTORS = (
+    "[aria-label='Close']",
+    "button:has-text('Close')",
+    "button:has-text('close')",
+    ".modal [data-testid='close'], .modal .close",
+)
+MODAL_OR_TRAVELLERS_SELECTORS = (
+    config.TRAVELLER_ITEM_SELECTOR,
+    "[aria-label='Close']",
+    "button:has-text('Close')",
+    ".modal [data-testid='close'], .modal .close",
+)
+
 
 def set_notifier(callback: Callable[[str], Awaitable[None]] | None) -> None:
     global _notify_callback
@@ -44,9 +66,10 @@ async def _notify_message(message: str) -> None:
 
 def read_input(path: str) -> dict[str, Any]:
     input_path = Path(path)
-    if not input_path.exists():
-        raise SystemExit(f"Input file not found: {input_path}")
-    data = json.loads(input_path.read_text())
+    try:
+        data = orjson.loads(input_path.read_bytes())
+    except FileNotFoundError:
+        raise SystemExit(f"Input file not found: {input_path}") from None
     # Required trips
     trips = data.get("trips", [])
     if not trips or not isinstance(trips, list):
@@ -92,7 +115,7 @@ async def perform_login(
     if progress_cb:
         await progress_cb(15, "loaded")
     await page.fill("#username", username)
-    await page.wait_for_timeout(500)
+    await page.locator("#password").wait_for(state="visible")
     await page.fill("#password", password)
     await page.click("input[type=submit][value='Login']")
 
@@ -121,58 +144,93 @@ async def perform_login(
 
     # Login succeeded
     if screenshot:
-        await page.screenshot(path=screenshot, full_page=True)
+        await _save_screenshot_if_changed(page, Path(screenshot))
 
     return page
 
 
-async def type_and_select_autocomplete(page, selector: str, value: str) -> None:
-    field = page.locator(selector).first
-    await field.click()
-    await field.fill("")
-    await field.type(value, delay=50)
-    option = page.locator('[role="option"]', has_text=value).first
+def _storage_state_path(username: str) -> Path:
+    digest = hashlib.sha256(username.lower().encode()).hexdigest()[:16]
+    return config.MYID_STORAGE_STATE_DIR / f"{digest}.json"
+
+
+def _storage_state_is_fresh(path: Path) -> bool:
     try:
-        await option.wait_for(timeout=4000)
-        await option.click()
-    except PlaywrightTimeout:
-        await field.press("Enter")
+        return time.time() - path.stat().st_mtime < config.MYID_STORAGE_STATE_MAX_AGE
+    except OSError:
+        return False
 
 
-async def type_and_select_in_container(container_or_field, selector: str, value: str) -> None:
+async def _resume_session(context):
     """
-    Type/select into an autocomplete inside a container or directly into a provided field locator.
+    Open the home page with restored cookies; return the page only if it is still signed in.
     """
-    field = container_or_field
-    # If we were given a container (e.g., Page or Locator that is not the input), try to find the input inside.
+    page = await context.new_page()
     try:
-        is_input_like = (
-            hasattr(container_or_field, "fill")
-            and hasattr(container_or_field, "press")
-            and not hasattr(container_or_field, "goto")
-        )
+        await page.goto(config.BASE_URLS[0], wait_until="domcontentloaded")
+        if "signon" not in page.url.lower():
+            # Race the form against a bounce to signon so an expired session falls back to login at once.
+            form_ready = asyncio.ensure_future(page.wait_for_selector(config.TRAVEL_STATUS_SELECTOR, timeout=15000))
+            bounced = asyncio.ensure_future(
+                page.wait_for_url(lambda url: "signon" in url.lower(), wait_until="commit", timeout=15000)
+            )
+            done, pending = await asyncio.wait({form_ready, bounced}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            failed = {task for task in done if task.exception()}
+            if form_ready in done and form_ready not in failed and "signon" not in page.url.lower():
+                return page
     except Exception:
-        is_input_like = False
-    if not is_input_like and hasattr(container_or_field, "locator"):
-        try:
-            field = container_or_field.locator(selector).first
-        except Exception:
-            field = container_or_field
-    # Fallback by placeholder if nothing found.
+        pass
+    await page.close()
+    return None
+
+
+async def _save_storage_state(context, path: Path) -> None:
     try:
-        if not await field.count() and hasattr(container_or_field, "locator"):
-            field = container_or_field.locator(f'input[placeholder*="{value}" i]').first
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await context.storage_state(path=str(path))
     except Exception:
-        pass
-    if not await field.count():
+        logger.debug("Could not persist myIDTravel session", exc_info=True)
+
+
+async def _save_screenshot_if_changed(page, path: Path) -> None:
+    """
+    Write a full-page screenshot, skipping the disk write when it matches the previous capture.
+    The digest of the last written image is kept next to it as `<name>.sha256`.
+    """
+    buffer = await page.screenshot(full_page=True)
+    digest = hashlib.sha256(buffer).digest()
+    digest_path = path.with_name(f"{path.name}.sha256")
+    if path.exists() and digest_path.exists() and digest_path.read_bytes() == digest:
         return
-    await field.click()
-    await field.fill("")
-    await field.type(value, delay=50)
-    page_obj = getattr(field, "page", None) or getattr(container_or_field, "page", None)
-    if not page_obj:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(buffer)
+    digest_path.write_bytes(digest)
+
+
+async def _dispatch_input_event(field) -> None:
+    await field.evaluate("el => el.dispatchEvent(new Event('input', { bubbles: true }))")
+
+
+async def _fill_and_select_option(page, field, value: str, options: Locator | None = None) -> None:
+    """
+    Fill an autocomplete input in one step and pick the matching option.
+    Falls back to per-key typing only when the widget ignores the programmatic input.
+    """
+    if options is None:
+        options = page.locator(config.AUTOCOMPLETE_OPTION_SELECTOR)
+    option = options.filter(has_text=value).first
+    await field.fill(value)
+    await _dispatch_input_event(field)
+    try:
+        await option.wait_for(timeout=1000)
+        await option.click()
         return
-    option = page_obj.locator('[role="option"]', has_text=value).first
+    except PlaywrightTimeout:
+        pass
+    await field.fill("")
+    await field.type(value)
     try:
         await option.wait_for(timeout=4000)
         await option.click()
@@ -180,6 +238,38 @@ async def type_and_select_in_container(container_or_field, selector: str, value:
         await field.press("Enter")
 
 
+async def type_and_select_autocomplete(page, field: str | Locator, value: str, options: Locator | None = None) -> None:
+    if isinstance(field, str):
+        field = page.locator(field).first
+    await field.click()
+    await _fill_and_select_option(page, field, value, options)
+
+
+async def _type_and_select_scoped(scope, page, selector: str, value: str) -> None:
+    field = scope.locator(selector).first
+    # Fallback by placeholder if nothing found.
+    if not await field.count():
+        field = scope.locator(f'input[placeholder*="{value}" i]').first
+        if not await field.count():
+            return
+    await field.click()
+    await _fill_and_select_option(page, field, value)
+
+
+async def type_and_select_in_page(page, selector: str, value: str) -> None:
+    """
+    Type/select into an autocomplete located anywhere on the page.
+    """
+    await _type_and_select_scoped(page, page, selector, value)
+
+
+async def type_and_select_in_container(container, selector: str, value: str) -> None:
+    """
+    Type/select into an autocomplete located inside a container locator.
+    """
+    await _type_and_select_scoped(container, container.page, selector, value)
+
+
 async def select_react_select(page, selector: str, value: str, placeholder_hint: str | None = None) -> None:
     input_el = page.locator(selector).first
     if not await input_el.count() and placeholder_hint:
@@ -189,14 +279,7 @@ async def select_react_select(page, selector: str, value: str, placeholder_hint:
     if not await input_el.count():
         return
     await input_el.click()
-    await input_el.fill("")
-    await input_el.type(value, delay=50)
-    option = page.locator('[role="option"]', has_text=value).first
-    try:
-        await option.wait_for(timeout=4000)
-        await option.click()
-    except PlaywrightTimeout:
-        await input_el.press("Enter")
+    await _fill_and_select_option(page, input_el, value)
 
 
 async def trigger_nonstop_flights(page, selector: str, value: str) -> None:
@@ -210,12 +293,7 @@ async def trigger_nonstop_flights(page, selector: str, value: str) -> None:
 
 async def select_flight_type(page, flight_type: str) -> None:
     """Click the flight type tab based on input (one-way, round-trip, multiple-legs)."""
-    mapping = {
-        "one-way": "One Way",
-        "round-trip": "Round Trip",
-        "multiple-legs": "Multiple Legs",
-    }
-    label = mapping.get(flight_type.lower())
+    label = FLIGHT_TYPE_LABELS.get(flight_type.lower())
     if not label:
         return
     tab = page.locator(f"{config.FLIGHT_TYPE} li", has_text=label).first
@@ -233,24 +311,28 @@ async def fill_text_input(page, selector: str, value: str, placeholder_hint: str
         field = page.locator(f'input[placeholder*="{placeholder_hint}" i]').first
     if await field.count():
         await field.click()
-        await field.fill("")
-        await field.type(value)
+        await field.fill(value)
+        await _dispatch_input_event(field)
         await field.press("Enter")
         return True
     return False
 
 
-def _input_locator(container, field_id: str, name_val: str | None = None, placeholder_hint: str | None = None):
-    """
-    Build a locator that tries id, then name, then placeholder within a container.
-    """
+@functools.lru_cache(maxsize=128)
+def _input_selector(field_id: str, name_val: str | None = None, placeholder_hint: str | None = None) -> str:
     parts = [f"input#{field_id}"]
     if name_val:
         parts.append(f"input[name='{name_val}']")
     if placeholder_hint:
         parts.append(f'input[placeholder*="{placeholder_hint}" i]')
-    selector = ", ".join(parts)
-    return container.locator(selector)
+    return ", ".join(parts)
+
+
+def _input_locator(container, field_id: str, name_val: str | None = None, placeholder_hint: str | None = None):
+    """
+    Build a locator that tries id, then name, then placeholder within a container.
+    """
+    return container.locator(_input_selector(field_id, name_val, placeholder_hint))
 
 
 async def _fill_input(locator, value: str) -> bool:
@@ -266,8 +348,7 @@ async def _fill_input(locator, value: str) -> bool:
     except Exception:
         pass
     try:
-        await handle.fill("")
-        await handle.type(value)
+        await handle.fill(value)
         await handle.press("Enter")
     except Exception:
         pass
@@ -330,15 +411,13 @@ async def _fill_time_input(handle, value: str) -> bool:
             f"{hour}:{minute.zfill(2)}",
         ]
 
-        # Click the input to open dropdown
+        # Click the input to open dropdown; the menu wait below covers the opening animation.
         try:
             await handle.scroll_into_view_if_needed()
             await handle.click()
-            await page_obj.wait_for_timeout(400)
         except Exception:
             try:
                 await handle.click(force=True)
-                await page_obj.wait_for_timeout(400)
             except Exception as e:
                 logger.debug("Could not click time input: %s", e)
                 return False
@@ -378,16 +457,12 @@ async def _fill_time_input(handle, value: str) -> bool:
 
                     if item_text == format_str:
                         try:
-                            await item.scroll_into_view_if_needed()
-                            await page_obj.wait_for_timeout(100)
                             await item.click()
-                            await page_obj.wait_for_timeout(300)
                             selected = True
                             break
                         except Exception:
                             try:
                                 await item.click(force=True)
-                                await page_obj.wait_for_timeout(300)
                                 selected = True
                                 break
                             except Exception:
@@ -399,6 +474,12 @@ async def _fill_time_input(handle, value: str) -> bool:
             logger.debug("No matching time option found for %s", value)
             return await _fill_time_fallback(handle, value)
 
+        # The menu loses its .show class once the choice is committed.
+        try:
+            await dropdown.wait_for(state="hidden", timeout=1000)
+        except PlaywrightTimeout:
+            pass
+
         return True
 
     except Exception as e:
@@ -412,8 +493,7 @@ async def _fill_time_fallback(handle, value: str) -> bool:
     Fallback method: directly set the time input value if dropdown fails.
     """
     try:
-        await handle.fill("")
-        await handle.type(value)
+        await handle.fill(value)
         await handle.press("Enter")
     except Exception:
         pass
@@ -436,6 +516,21 @@ async def _fill_time_fallback(handle, value: str) -> bool:
         return False
 
 
+async def _run_fills(*fills: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Run independent widget fills, concurrently when MYID_PARALLEL_AUTOCOMPLETE is set.
+    Either way the first failure propagates; in parallel mode the other fills still finish first.
+    """
+    if not config.MYID_PARALLEL_AUTOCOMPLETE:
+        for fill in fills:
+            await fill()
+        return
+    results = await asyncio.gather(*(fill() for fill in fills), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
 async def fill_leg_fields(container, date_val: str, time_val: str, class_val: str) -> None:
     """
     Fill date, time, and class fields within a specific container (for round-trip duplicate groups).
@@ -463,13 +558,7 @@ async def fill_leg_fields(container, date_val: str, time_val: str, class_val: st
 
 async def close_modal_if_present(page) -> None:
     # Try a few common close buttons.
-    selectors = [
-        "[aria-label='Close']",
-        "button:has-text('Close')",
-        "button:has-text('close')",
-        ".modal [data-testid='close'], .modal .close",
-    ]
-    for sel in selectors:
+    for sel in MODAL_CLOSE_SELECTORS:
         btn = page.locator(sel).first
         if await btn.count():
             try:
@@ -484,13 +573,7 @@ async def wait_for_modal_or_travellers(page, timeout_ms: int = 8000) -> None:
     Wait for a traveller modal (or any common modal close button) to appear before continuing.
     Helps avoid racing ahead while the modal is still mounting.
     """
-    selectors = [
-        config.TRAVELLER_ITEM_SELECTOR,
-        "[aria-label='Close']",
-        "button:has-text('Close')",
-        ".modal [data-testid='close'], .modal .close",
-    ]
-    for sel in selectors:
+    for sel in MODAL_OR_TRAVELLERS_SELECTORS:
         try:
             await page.wait_for_selector(sel, timeout=timeout_ms)
             return
@@ -500,14 +583,32 @@ async def wait_for_modal_or_travellers(page, timeout_ms: int = 8000) -> None:
             continue
 
 
+async def _apply_traveller_check(item, should_check: bool) -> None:
+    checkbox = item.locator(config.TRAVELLER_CHECKBOX_SELECTOR).first
+    if not await checkbox.count():
+        return
+
+    try:
+        checked = await checkbox.is_checked()
+    except Exception:
+        checked = False
+
+    if should_check and not checked:
+        await checkbox.check(force=True)
+    elif not should_check and checked:
+        await checkbox.uncheck(force=True)
+
+
 async def apply_traveller_selection(page, travellers: list[dict]) -> None:
     """Check/uncheck travellers in the modal based on input list and set salutation when provided."""
     if not travellers:
         return
 
-    # Wait briefly for modal to render.
-    await page.wait_for_timeout(500)
     items = page.locator(config.TRAVELLER_ITEM_SELECTOR)
+    try:
+        await items.first.wait_for(state="attached", timeout=1000)
+    except PlaywrightTimeout:
+        pass
     count = await items.count()
     if count == 0:
         await close_modal_if_present(page)
@@ -524,31 +625,18 @@ async def apply_traveller_selection(page, travellers: list[dict]) -> None:
             "salutation": (trav.get("salutation") or "").strip().upper(),
         }
 
-    for idx in range(count):
-        item = items.nth(idx)
-        name_text = (await item.locator(config.TRAVELLER_NAME_SELECTOR).inner_text()).strip()
-        name_key = name_text.lower()
-
-        if name_key not in desired:
-            continue
-
-        desired_state = desired[name_key]
-        should_check = desired_state["checked"]
-        checkbox = item.locator(config.TRAVELLER_CHECKBOX_SELECTOR).first
-
-        if not await checkbox.count():
-            continue
-
-        try:
-            checked = await checkbox.is_checked()
-        except Exception:
-            checked = False
+    names = await asyncio.gather(
+        *(items.nth(idx).locator(config.TRAVELLER_NAME_SELECTOR).inner_text() for idx in range(count))
+    )
+    name_keys = [name.strip().lower() for name in names]
+    matched = [(idx, desired[key]) for idx, key in enumerate(name_keys) if key in desired]
 
-        if should_check and not checked:
-            await checkbox.check(force=True)
-        elif not should_check and checked:
-            await checkbox.uncheck(force=True)
+    # Checkbox rows are independent, so toggle them concurrently; check()/uncheck() wait for the new state.
+    await asyncio.gather(*(_apply_traveller_check(items.nth(idx), state["checked"]) for idx, state in matched))
 
+    # Salutation dropdowns share one popup menu, so they stay serialized.
+    for idx, desired_state in matched:
+        item = items.nth(idx)
         # Apply salutation if provided (MR/MS) using the dropdown sibling to this traveller item.
         salutation = desired_state.get("salutation")
         if salutation in {"MR", "MS"}:
@@ -563,11 +651,14 @@ async def apply_traveller_selection(page, travellers: list[dict]) -> None:
             if await dropdown.count():
                 try:
                     await dropdown.click()
-                    await page.wait_for_timeout(150)
+                    menus = page.locator(".styles_LabelWithDropdown_DropdownMenu__UXOnK.dropdown-menu.show")
+                    try:
+                        await menus.first.wait_for(state="visible", timeout=1000)
+                    except PlaywrightTimeout:
+                        pass
                     # Scope menu to the same parent block when possible.
                     menu = parent.locator(".styles_LabelWithDropdown_DropdownMenu__UXOnK.dropdown-menu.show").first
                     if not await menu.count():
-                        menus = page.locator(".styles_LabelWithDropdown_DropdownMenu__UXOnK.dropdown-menu.show")
                         menu = menus.last
                     option = menu.locator("button.dropdown-item", has_text=salutation).first
                     if await option.count():
@@ -576,8 +667,6 @@ async def apply_traveller_selection(page, travellers: list[dict]) -> None:
                     # Ignore salutation failures and continue.
                     pass
 
-        await page.wait_for_timeout(500)
-
 
 async def add_travel_partners(page, partners: list[dict]) -> None:
     """Add travel partners using the modal form."""
@@ -588,14 +677,19 @@ async def add_travel_partners(page, partners: list[dict]) -> None:
     if not await add_btn.count():
         return
 
+    containers = page.locator("div.travellerDiv")
     for _idx, partner in enumerate(partners):
         try:
+            previous_count = await containers.count()
             await add_btn.click()
-            await page.wait_for_timeout(300)
         except Exception:
             continue
+        # Wait for the new partner form to mount rather than a fixed delay.
+        try:
+            await containers.nth(previous_count).wait_for(state="attached", timeout=2000)
+        except PlaywrightTimeout:
+            pass
 
-        containers = page.locator("div.travellerDiv")
         count = await containers.count()
         container = containers.nth(count - 1) if count else page
 
@@ -647,10 +741,26 @@ async def add_travel_partners(page, partners: list[dict]) -> None:
         if await add_partner_btn.count():
             try:
                 await add_partner_btn.click()
+                await add_partner_btn.wait_for(state="hidden", timeout=1000)
             except Exception:
                 pass
 
-        await page.wait_for_timeout(300)
+
+async def _mount_leg(add_btn: Locator, leg_containers: Locator, airline_containers: Locator, idx: int) -> bool:
+    """
+    Click Add Flight until both the leg and airline containers at idx are attached; one retry.
+    """
+    for _attempt in range(2):
+        try:
+            await add_btn.click()
+            await leg_containers.nth(idx).wait_for(state="attached", timeout=3000)
+            await airline_containers.nth(idx).wait_for(state="attached", timeout=3000)
+            return True
+        except Exception:
+            # The click may have been swallowed by a re-render; recount so a slow mount is not doubled.
+            if min(await leg_containers.count(), await airline_containers.count()) > idx:
+                return True
+    return False
 
 
 async def fill_multiple_legs(page, trips: list[dict], itinerary: list[dict]) -> None:
@@ -668,40 +778,38 @@ async def fill_multiple_legs(page, trips: list[dict], itinerary: list[dict]) ->
     origin_inputs = page.locator(config.ORIGIN_SELECTOR)
     dest_inputs = page.locator(config.DEST_SELECTOR)
 
-    for idx, trip in enumerate(trips):
-        # Ensure containers exist for this leg; if not, click Add Flight and refresh.
-        while True:
-            air_count = await airline_containers.count()
-            leg_count = await leg_containers.count()
-            if air_count > idx and leg_count > idx:
-                break
-            if not await add_btn.count():
-                break
-            try:
-                await add_btn.scroll_into_view_if_needed()
-                await add_btn.click()
-                await page.wait_for_timeout(600)
-            except Exception:
+    # Read the mounted leg count once, then click Add Flight per missing leg and confirm each one mounted.
+    mounted = min(await airline_containers.count(), await leg_containers.count())
+    if mounted < len(trips) and await add_btn.count():
+        try:
+            await add_btn.scroll_into_view_if_needed()
+        except Exception:
+            pass
+        for idx in range(mounted, len(trips)):
+            if not await _mount_leg(add_btn, leg_containers, airline_containers, idx):
                 break
-            airline_containers = page.locator(config.AIRLINE_REASON_CONTAINER)
-            leg_containers = page.locator(config.LEG_SELECTOR)
-            origin_inputs = page.locator(config.ORIGIN_SELECTOR)
-            dest_inputs = page.locator(config.DEST_SELECTOR)
+            mounted = idx + 1
+    if mounted < len(trips):
+        logger.warning("Only %s of %s myIDTravel legs mounted; later legs are skipped", mounted, len(trips))
 
+    for idx, trip in enumerate(trips):
+        # Filling a missing leg would fall back to the first leg's inputs and overwrite them.
+        if idx and idx >= mounted:
+            break
         origin = trip.get("origin", "")
         dest = trip.get("destination", "")
         if origin:
-            origin_field = (
-                origin_inputs.nth(idx)
+            origin_selector = (
+                f"{config.ORIGIN_SELECTOR} >> nth={idx}"
                 if await origin_inputs.count() > idx
-                else page.locator(config.ORIGIN_SELECTOR).first
+                else config.ORIGIN_SELECTOR
             )
-            await type_and_select_in_container(origin_field, config.ORIGIN_SELECTOR, origin)
+            await type_and_select_in_page(page, origin_selector, origin)
         if dest:
-            dest_field = (
-                dest_inputs.nth(idx) if await dest_inputs.count() > idx else page.locator(config.DEST_SELECTOR).first
+            dest_selector = (
+                f"{config.DEST_SELECTOR} >> nth={idx}" if await dest_inputs.count() > idx else config.DEST_SELECTOR
             )
-            await type_and_select_in_container(dest_field, config.DEST_SELECTOR, dest)
+            await type_and_select_in_page(page, dest_selector, dest)
 
         leg_data = itinerary[idx] if idx < len(itinerary) else {}
         leg_container = leg_containers.nth(idx) if await leg_containers.count() > idx else page
@@ -720,81 +828,71 @@ async def click_traveller_continue(page) -> None:
         try:
             await continue_button.scroll_into_view_if_needed()
             await continue_button.click(force=True)
-            await page.wait_for_timeout(500)
+            await continue_button.wait_for(state="hidden", timeout=2000)
         except Exception:
             pass
 
 
+def _filter_routings(data: dict[str, Any] | list[Any]) -> list[dict[str, Any]]:
+    """
+    Copy each routing of a flightschedule payload, either {"routings": [...]} or the bare list, with its
+    flights narrowed to the selectable ones.
+    """
+    routings = data.get("routings", []) if isinstance(data, dict) else data
+    filtered: list[dict[str, Any]] = []
+    for routing in routings or ():
+        if not isinstance(routing, dict):
+            continue
+        flights = routing.get("flights")
+        if not isinstance(flights, list):
+            flights = ()
+        filtered.append(
+            {
+                **routing,
+                "flights": [
+                    flight for flight in flights if isinstance(flight, dict) and flight.get("selectable") is True
+                ],
+            }
+        )
+    return filtered
+
+
+def _is_flightschedule_response(response) -> bool:
+    return response.request.method.lower() == "post" and "flightschedule" in response.url.lower()
+
+
 async def submit_form_and_capture(
     page,
     output_path: Path | None = None,
     progress_cb: Callable[[int, str], Awaitable[None]] | None = None,
 ) -> Any | None:
-    loop = asyncio.get_event_loop()
-    flightschedule_future: asyncio.Future = loop.create_future()
-
-    def handle_response(resp):
-        try:
-            if resp.request.method.lower() == "post" and "flightschedule" in resp.url.lower():
-                if not flightschedule_future.done():
-                    flightschedule_future.set_result(resp)
-        except Exception:
-            return
-
-    page.on("response", handle_response)
-
     submit_btn = page.locator(config.SUBMIT_SELECTOR).first
-    await submit_btn.click()
-    if progress_cb:
-        await progress_cb(50, "submitted")
-
     try:
-        response = await asyncio.wait_for(flightschedule_future, timeout=20000)
+        # expect_response removes its listener once the flightschedule POST resolves (or times out).
+        async with page.expect_response(_is_flightschedule_response, timeout=20000) as response_info:
+            await submit_btn.click()
+            if progress_cb:
+                await progress_cb(50, "submitted")
+        response = await response_info.value
+        body = await response.body()
         try:
-            data = await response.json()
-        except Exception:
-            data = await response.text()
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            data = body.decode("utf-8", errors="replace")
         if output_path:
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(json.dumps(data, indent=2) if isinstance(data, (dict, list)) else str(data))
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2) if isinstance(data, (dict, list)) else body
+            await asyncio.to_thread(output_path.write_bytes, payload)
             logger.info("Saved flightschedule response to %s", output_path)
         if progress_cb:
             await progress_cb(85, "parsed")
-        if isinstance(data, dict):
-            routings = data.get("routings", [])
-            filtered_routings: list[dict[str, Any]] = []
-            for routing in routings:
-                if not isinstance(routing, dict):
-                    continue
-                flights = routing.get("flights", [])
-                if not isinstance(flights, list):
-                    flights = []
-                selectable_flights = [
-                    flight for flight in flights if isinstance(flight, dict) and flight.get("selectable") is True
-                ]
-                trimmed = dict(routing)
-                trimmed["flights"] = selectable_flights
-                filtered_routings.append(trimmed)
-            has_flights = any(routing.get("flights") for routing in filtered_routings)
-            if not has_flights:
-                await _notify_message("MyIDTravel: no selectable flights found for the search.")
-            return filtered_routings
-        if isinstance(data, list):
-            filtered_routings = []
-            for routing in data:
-                if not isinstance(routing, dict):
-                    continue
-                flights = routing.get("flights", [])
-                if not isinstance(flights, list):
-                    flights = []
-                selectable_flights = [
-                    flight for flight in flights if isinstance(flight, dict) and flight.get("selectable") is True
-                ]
-                trimmed = dict(routing)
-                trimmed["flights"] = selectable_flights
-                filtered_routings.append(trimmed)
-            return filtered_routings
-    except asyncio.TimeoutError:
+        if not isinstance(data, (dict, list)):
+            return None
+        filtered_routings = _filter_routings(data)
+        if isinstance(data, dict) and not any(routing.get("flights") for routing in filtered_routings):
+            await _notify_message("MyIDTravel: no selectable flights found for the search.")
+        return filtered_routings
+    except PlaywrightTimeout:
         logger.warning("Timed out waiting for flightschedule response; no JSON saved.")
         await _notify_message("MyIDTravel: Timed out waiting for flight schedule response; no JSON saved.")
     except Exception as exc:
@@ -838,28 +936,44 @@ async def fill_form_from_input(
     # Select flight type tab
     flight_type = input_data.get("flight_type", "one-way").lower()
     await select_flight_type(page, flight_type)
+    if flight_type != "multiple-legs":
+        expected_legs = 2 if flight_type == "round-trip" else 1
+        try:
+            await page.locator(config.LEG_SELECTOR).nth(expected_legs - 1).wait_for(state="attached", timeout=2000)
+        except PlaywrightTimeout:
+            pass
 
     only_nonstop_flights = input_data.get("nonstop_flights", "")
     if only_nonstop_flights:
         await trigger_nonstop_flights(page, config.NONSTOP_FLIGHTS_CONTAINER, only_nonstop_flights)
 
+    selects = []
     airline = input_data.get("airline", "")
     if airline:
-        await select_react_select(page, config.AIRLINE_SELECTOR, airline, placeholder_hint="Airline")
+        selects.append(
+            functools.partial(select_react_select, page, config.AIRLINE_SELECTOR, airline, placeholder_hint="Airline")
+        )
 
     travel_status = input_data.get("travel_status", "")
     if travel_status:
-        try:
-            selector_count = await page.locator(config.TRAVEL_STATUS_SELECTOR).count()
-            fallback_count = await page.locator("input[placeholder*='Travel' i], input[aria-label*='Travel' i]").count()
-            logger.info(
-                "Travel status locator counts: selector=%s fallback=%s",
-                selector_count,
-                fallback_count,
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                match_count = await page.locator(
+                    f"{config.TRAVEL_STATUS_SELECTOR}, input[placeholder*='Travel' i], input[aria-label*='Travel' i]"
+                ).count()
+                logger.debug("Travel status locator matches: %s", match_count)
+            except Exception as exc:
+                logger.debug("Travel status debug failed: %s", exc)
+        selects.append(
+            functools.partial(
+                select_react_select,
+                page,
+                config.TRAVEL_STATUS_SELECTOR,
+                travel_status,
+                placeholder_hint="Travel status",
             )
-        except Exception as exc:
-            logger.info("Travel status debug failed: %s", exc)
-        await select_react_select(page, config.TRAVEL_STATUS_SELECTOR, travel_status, placeholder_hint="Travel status")
+        )
+    await _run_fills(*selects)
 
     trips = input_data.get("trips", [])
     trip0 = trips[0] if trips else {}
@@ -871,8 +985,14 @@ async def fill_form_from_input(
         departure_leg = itinerary[0] if itinerary else {}
         return_leg = itinerary[1] if flight_type == "round-trip" and len(itinerary) > 1 else None
 
-        await type_and_select_autocomplete(page, config.ORIGIN_SELECTOR, trip0.get("origin", ""))
-        await type_and_select_autocomplete(page, config.DEST_SELECTOR, trip0.get("destination", ""))
+        # Resolve the form locators once and share the option list between both airport fields.
+        options = page.locator(config.AUTOCOMPLETE_OPTION_SELECTOR)
+        origin_field = page.locator(config.ORIGIN_SELECTOR).first
+        dest_field = page.locator(config.DEST_SELECTOR).first
+        await _run_fills(
+            functools.partial(type_and_select_autocomplete, page, origin_field, trip0.get("origin", ""), options),
+            functools.partial(type_and_select_autocomplete, page, dest_field, trip0.get("destination", ""), options),
+        )
 
         # Containers for date/time/class groups (one per leg for round-trip).
         leg_containers = page.locator(config.LEG_SELECTOR)
@@ -896,15 +1016,13 @@ async def fill_form_from_input(
                 return_leg.get("class", ""),
             )
 
-    await page.wait_for_timeout(500)
+    # The submit click auto-waits for the button to be enabled, so no settle delay is needed here.
     if progress_cb:
         await progress_cb(35, "form filled")
 
     # Save under a consistent flightschedule filename (independent of flight_type input).
     return await submit_form_and_capture(page, output_path, progress_cb=progress_cb)
 
-    await page.wait_for_timeout(1000)
-
 
 async def run(
     headless: bool,
@@ -916,23 +1034,35 @@ async def run(
     username: str | None = None,
     password: str | None = None,
     progress_cb: Callable[[int, str], Awaitable[None]] | None = None,
+    wait_for_close: bool = False,
 ) -> Any | None:
     resolved_input = input_data or read_input(input_path or "input.json")
 
-    async with async_playwright() as p:
-        if progress_cb:
-            await progress_cb(5, "launching")
-        browser = await p.chromium.launch(headless=headless)
-        context = await browser.new_context()
-
-        page = await perform_login(
-            context,
-            headless=headless,
-            screenshot=screenshot,
-            username=username,
-            password=password,
-            progress_cb=progress_cb,
-        )
+    if progress_cb:
+        await progress_cb(5, "launching")
+    username = username or os.getenv("UAL_USERNAME")
+    storage_path = _storage_state_path(username) if username else None
+    has_session = storage_path is not None and _storage_state_is_fresh(storage_path)
+    context = await browser_pool.get_context(
+        "myidtravel", headless=headless, storage_state=storage_path if has_session else None
+    )
+    try:
+        page = await _resume_session(context) if has_session else None
+        if page is not None:
+            logger.info("Reusing saved myIDTravel session")
+            if progress_cb:
+                await progress_cb(15, "loaded")
+        else:
+            page = await perform_login(
+                context,
+                headless=headless,
+                screenshot=screenshot,
+                username=username,
+                password=password,
+                progress_cb=progress_cb,
+            )
+            if storage_path:
+                await _save_storage_state(context, storage_path)
         data = await fill_form_from_input(page, resolved_input, output_path=output_path, progress_cb=progress_cb)
 
         if final_screenshot:
@@ -944,12 +1074,12 @@ async def run(
                     await progress_cb(95, "screenshot")
             except Exception:
                 pass
-
-        await browser.close()
-        if progress_cb:
-            await progress_cb(100, "done")
-        return data
-    return None
+    finally:
+        # Closing can lag behind the result; only block on it when the caller asks to.
+        await browser_pool.release(context, wait=wait_for_close)
+    if progress_cb:
+        await progress_cb(100, "done")
+    return data
 
 
 def parse_args() -> argparse.Namespace:
@@ -966,13 +1096,22 @@ async def main() -> None:
     screenshot = args.screenshot or None
     input_path = args.input or None
     output_path = Path(args.output) if args.output else None
-    await run(
-        headless=not args.headed,
-        screenshot=screenshot,
-        input_path=input_path,
-        output_path=output_path,
-    )
+    try:
+        await run(
+            headless=not args.headed,
+            screenshot=screenshot,
+            input_path=input_path,
+            output_path=output_path,
+        )
+    finally:
+        await browser_pool.shutdown()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop (not installed on Windows) cuts per-await overhead on the CDP chatter.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -1,23 +1,29 @@
 import argparse
 import asyncio
-import json
+import functools
+import hashlib
 import logging
 import os
 import re
 import sys
+import time
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable, Iterable
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
+from playwright.async_api import Locator
 from playwright.async_api import TimeoutError as PlaywrightTimeout
-from playwright.async_api import async_playwright
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 if str(BASE_DIR) not in sys.path:
     sys.path.append(str(BASE_DIR))
 
 from app import config
+from app.bots import browser_pool
 from app.bots.myidtravel_bot import read_input
 
 logger = logging.getLogger(__name__)
@@ -44,12 +50,57 @@ async def _notify_message(message: str) -> None:
 
 
 LOGIN_URL = "https://stafftraveler.app/login"
+_STAFF_REQUEST_URL_RE = re.compile(config.STAFF_REQUEST_URL_PATTERN, re.IGNORECASE)
+_BANNER_BUTTONS = (
+    "button:text-matches('accept|agree|got it|okay|close', 'i'), "
+    "button[aria-label*='accept' i], button[aria-label*='close' i]"
+)
+_AUTHENTICATED_MARKERS = f"{config.STAFF_FLIGHT_CONTAINER}, {config.STAFF_SEARCH_BUTTON}"
+_EMAIL_SELECTORS = (
+    'input[name="email"]',
+    'input[type="email"]',
+    'input[autocomplete="email"]',
+    'input[placeholder*="email" i]',
+    'input[id*="email" i]',
+)
+_CONTINUE_SELECTORS = ("#continue", 'button[type="button"]')
+_PASSWORD_SELECTORS = (
+    'input[name="password"]',
+    'input[type="password"]',
+    'input[autocomplete="current-password"]',
+    'input[placeholder*="password" i]',
+    'input[id*="password" i]',
+)
+_LOGIN_BUTTON_SELECTORS = ("#login-with-password",)
+_LOGIN_ERROR_SELECTOR = ".error, .alert, [data-testid*='error' i], [role='alert'], [class*='error' i]"
+STAFF_LAUNCH_ARGS = ("--disable-blink-features=AutomationControlled",)
 STEALTH_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
 )
 
 
-async def _first_locator(page, selectors: list[str]):
+def _env_credentials() -> tuple[str | None, str | None]:
+    return os.getenv("ST_USERNAME"), os.getenv("ST_PASSWORD")
+
+
+def _resolve_credentials(username: str | None, password: str | None) -> tuple[str, str]:
+    env_username, env_password = _env_credentials()
+    username = username or env_username
+    password = password or env_password
+    if not username or not password:
+        raise SystemExit("Set ST_USERNAME and ST_PASSWORD in your environment before running.")
+    return username, password
+
+
+def _ensure_dir(path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+
+
+def _leg_selectors(precomputed: tuple[str, ...], template: str, count: int) -> list[str]:
+    return [precomputed[i] if i < len(precomputed) else template.format(index=i) for i in range(count)]
+
+
+async def _first_locator(page, selectors: Iterable[str]):
     for selector in selectors:
         locator = page.locator(selector)
         if await locator.count():
@@ -57,34 +108,68 @@ async def _first_locator(page, selectors: list[str]):
     return None
 
 
-async def _wait_for_first_locator(page, selectors: Iterable[str], timeout_ms: int = 10000, poll_ms: int = 200):
-    start = asyncio.get_event_loop().time()
-    while (asyncio.get_event_loop().time() - start) * 1000 < timeout_ms:
-        locator = await _first_locator(page, list(selectors))
-        if locator:
-            return locator
-        await page.wait_for_timeout(poll_ms)
+def _is_plain_css(selector: str) -> bool:
+    return ">>" not in selector and not re.match(r"^\w+=", selector)
+
+
+@functools.cache
+def _combined_css(selectors: tuple[str, ...]) -> str | None:
+    """
+    One selector-list string for a group of plain CSS candidates, or None when any needs a Playwright engine.
+    """
+    if all(_is_plain_css(selector) for selector in selectors):
+        return ", ".join(selectors)
     return None
 
 
+async def _wait_for_first_locator(page, selectors: Iterable[str], timeout_ms: int = 10000):
+    selectors = tuple(selectors)
+    try:
+        combined = _combined_css(selectors)
+        if combined:
+            await page.wait_for_selector(combined, state="attached", timeout=timeout_ms)
+        else:
+            tasks = [
+                asyncio.create_task(page.locator(selector).first.wait_for(state="attached", timeout=timeout_ms))
+                for selector in selectors
+            ]
+            pending = set(tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    if any(not task.exception() for task in done):
+                        break
+                else:
+                    return None
+            finally:
+                for task in pending:
+                    task.cancel()
+    except PlaywrightTimeout:
+        return None
+    # Keep the caller's priority order when several candidates are present.
+    return await _first_locator(page, selectors)
+
+
 async def _dismiss_banners(page) -> None:
-    buttons = [
-        page.get_by_role("button", name=re.compile("accept|agree|got it|okay", re.I)),
-        page.get_by_role("button", name=re.compile("close", re.I)),
-    ]
-    for btn in buttons:
+    buttons = page.locator(_BANNER_BUTTONS)
+    # At most a consent banner plus one closable overlay.
+    for _ in range(2):
         try:
-            if await btn.count():
-                await btn.click()
-                await page.wait_for_timeout(200)
+            if not await buttons.count():
+                return
+            button = await buttons.first.element_handle(timeout=1000)
+            await button.click()
+            # Detached counts as hidden, so this returns as soon as the banner is gone.
+            await button.wait_for_element_state("hidden", timeout=1000)
         except Exception:
-            continue
+            return
 
 
-async def _fill_autosuggest_field(page, trigger_selector: str, value: str) -> None:
+async def _fill_autosuggest_field(page, trigger: str | Locator, value: str) -> None:
     if not value:
         return
-    trigger = page.locator(trigger_selector).first
+    if isinstance(trigger, str):
+        trigger = page.locator(trigger).first
     if not await trigger.count():
         return
     try:
@@ -97,103 +182,168 @@ async def _fill_autosuggest_field(page, trigger_selector: str, value: str) -> No
         await input_box.wait_for(state="visible", timeout=4000)
     except Exception:
         return
+    options = page.locator(config.STAFF_AUTOSUGGEST_OPTION).first
     try:
-        await input_box.fill("")
-        await input_box.type(value, delay=500)
+        await input_box.fill(value)
+        try:
+            await options.wait_for(state="visible", timeout=500)
+        except PlaywrightTimeout:
+            # The suggest list did not react to fill(); a real keystroke for the last character triggers it.
+            await input_box.fill(value[:-1])
+            await input_box.type(value[-1:])
+            try:
+                await options.wait_for(state="visible", timeout=4000)
+            except PlaywrightTimeout:
+                pass
         await input_box.press("Enter")
     except Exception:
         pass
-    await page.wait_for_timeout(300)
-
-
-async def _scrape_results(page, selectable_numbers: set[str] | None = None) -> list[dict]:
-    results = []
-    containers = page.locator(config.STAFF_RESULTS_CONTAINER)
+    # The suggestion overlay unmounts once a value is committed.
     try:
-        await containers.first.wait_for(state="visible", timeout=8000)
-    except Exception:
-        return results
+        await input_box.wait_for(state="hidden", timeout=1000)
+    except PlaywrightTimeout:
+        pass
 
-    count = await containers.count()
-    for idx in range(count):
-        group = containers.nth(idx)
-        date_text = ""
-        day_text = ""
-        header = group.locator(".css-1vdvsal")
-        if await header.count():
-            parts = [t.strip() for t in await header.locator("p").all_text_contents()]
-            if parts:
-                date_text = parts[0]
-            if len(parts) > 1:
-                day_text = parts[1]
-
-        flights = []
-        flight_cards = group.locator(".css-1yt60yy")
-        card_count = await flight_cards.count()
-        cards_to_click: list[int] = []
-        for j in range(card_count):
-            card = flight_cards.nth(j)
-            airline = ""
-            airline_nodes = await card.locator(".css-zvlevn").all_text_contents()
-            if airline_nodes:
-                airline = airline_nodes[0].strip()
-            if not airline:
-                alt_nodes = await card.locator("img[alt]").all_inner_texts()
-                if alt_nodes:
-                    airline = alt_nodes[0].strip()
-
-            flight_number = ""
-            flight_nodes = await card.locator(".css-1nthn72").all_text_contents()
-            if flight_nodes:
-                flight_number = flight_nodes[0].strip()
-                if selectable_numbers:
-                    variants = _flight_number_variants(flight_number)
-                    if any(variant in selectable_numbers for variant in variants):
-                        cards_to_click.append(j)
-
-            aircraft = ""
-            aircraft_nodes = await card.locator(".css-15x0uos .chakra-text").all_text_contents()
-            if aircraft_nodes:
-                aircraft = aircraft_nodes[0].strip()
-
-            duration = ""
-            duration_nodes = await card.locator(".css-phz870 p").all_text_contents()
-            if duration_nodes:
-                duration = duration_nodes[-1].strip()
-
-            airports = await card.locator(".css-wib9zn p").all_text_contents()
-            origin = airports[0].strip() if len(airports) > 0 else ""
-            destination = airports[1].strip() if len(airports) > 1 else ""
-
-            times = await card.locator(".css-1g1rqrm p").all_text_contents()
-            time_str = " - ".join([t.strip() for t in times if t.strip()]) if times else ""
-
-            flights.append(
-                {
-                    "airlines": airline,
-                    "aircraft": aircraft,
-                    "airline_flight_number": flight_number,
-                    "origin": origin,
-                    "destination": destination,
-                    "time": time_str,
-                    "duration": duration,
-                }
-            )
 
-        results.append(
+_RESULT_SELECTORS = {
+    "container": config.STAFF_RESULTS_CONTAINER,
+    "header": ".css-1vdvsal",
+    "card": ".css-1yt60yy",
+    "airline": ".css-zvlevn",
+    "flightNum": ".css-1nthn72",
+    "aircraft": ".css-15x0uos .chakra-text",
+    "duration": ".css-phz870 p",
+    "airports": ".css-wib9zn p",
+    "times": ".css-1g1rqrm p",
+}
+
+
+# Resolved card selector per result-group layout; hash-class rot only costs one rediscovery.
+_CARD_SELECTOR_CACHE_SIZE = 32
+_card_selector_cache: OrderedDict[str, str] = OrderedDict()
+_TIME_MARKER_RE = re.compile(r"\b\d{1,2}:\d{2}\b")
+
+
+def _texts(root: LexborHTMLParser | LexborNode, selector: str) -> list[str]:
+    return [node.text(deep=True).strip() for node in root.css(selector)]
+
+
+def _layout_key(group: LexborHTMLParser) -> str:
+    """
+    Fingerprint a date group by its container and header classes; it changes whenever a deploy rehashes
+    the CSS classes but not with the number of cards in the group.
+    """
+    root = group.css_first(config.STAFF_RESULTS_CONTAINER) or group.body
+    if root is None:
+        return ""
+    header = root.child
+    while header is not None and header.tag == "-text":
+        header = header.next
+    header_class = (header.attributes.get("class") or "") if header is not None else ""
+    return f"{root.attributes.get('class') or ''}|{header_class}"
+
+
+def _discover_card_selector(group: LexborHTMLParser) -> str | None:
+    """
+    Find the repeated flight row structurally: the nearest ancestor of an airline logo that shows a departure time.
+    """
+    counts: dict[str, int] = {}
+    for img in group.css("img[alt]"):
+        node = img.parent
+        while node is not None and node.tag not in ("body", "html"):
+            # Separate the text nodes; adjacent <p> times like "08:15" "11:40" otherwise run together.
+            if _TIME_MARKER_RE.search(node.text(deep=True, separator=" ")):
+                classes = (node.attributes.get("class") or "").split()
+                if classes:
+                    selector = f".{classes[0]}"
+                    counts[selector] = counts.get(selector, 0) + 1
+                break
+            node = node.parent
+    return max(counts, key=counts.get) if counts else None
+
+
+def _resolve_card_selector(group: LexborHTMLParser) -> str:
+    key = _layout_key(group)
+    cached = _card_selector_cache.get(key)
+    if cached:
+        _card_selector_cache.move_to_end(key)
+        return cached
+    selector = _RESULT_SELECTORS["card"]
+    if not group.css_first(selector):
+        discovered = _discover_card_selector(group)
+        if discovered:
+            logger.warning("StaffTraveler card selector %s matched nothing; falling back to %s", selector, discovered)
+            selector = discovered
+    _card_selector_cache[key] = selector
+    if len(_card_selector_cache) > _CARD_SELECTOR_CACHE_SIZE:
+        _card_selector_cache.popitem(last=False)
+    return selector
+
+
+def _parse_result_group(html: str) -> tuple[dict[str, Any], str]:
+    """
+    Parse one results date group from its outerHTML snapshot; also returns the card selector that matched.
+    """
+    group = LexborHTMLParser(html)
+    header = _texts(group, f"{_RESULT_SELECTORS['header']} p")
+    card_selector = _resolve_card_selector(group)
+    flights = []
+    for card in group.css(card_selector):
+        airline = next(iter(_texts(card, _RESULT_SELECTORS["airline"])), "")
+        if not airline:
+            img = card.css_first("img[alt]")
+            airline = (img.attributes.get("alt") or "").strip() if img else ""
+        durations = _texts(card, _RESULT_SELECTORS["duration"])
+        airports = _texts(card, _RESULT_SELECTORS["airports"])
+        flights.append(
             {
-                "flight_date": date_text,
-                "day": day_text,
-                "flight_details": flights,
+                "airlines": airline,
+                "aircraft": next(iter(_texts(card, _RESULT_SELECTORS["aircraft"])), ""),
+                "airline_flight_number": next(iter(_texts(card, _RESULT_SELECTORS["flightNum"])), ""),
+                "origin": airports[0] if len(airports) > 0 else "",
+                "destination": airports[1] if len(airports) > 1 else "",
+                "time": " - ".join(t for t in _texts(card, _RESULT_SELECTORS["times"]) if t),
+                "duration": durations[-1] if durations else "",
             }
         )
+    group_data = {
+        "flight_date": header[0] if header else "",
+        "day": header[1] if len(header) > 1 else "",
+        "flight_details": flights,
+    }
+    return group_data, card_selector
 
-        for offset, idx_to_click in enumerate(cards_to_click):
-            try:
-                await flight_cards.nth(max(0, idx_to_click - offset)).click()
-                await page.wait_for_timeout(250)
-            except Exception:
-                continue
+
+async def _scrape_results(page, selectable_numbers: set[str] | None = None) -> list[dict]:
+    containers = page.locator(config.STAFF_RESULTS_CONTAINER)
+    try:
+        await containers.first.wait_for(state="visible", timeout=8000)
+    except Exception:
+        return []
+
+    # One snapshot round-trip; parsing happens off the page's main thread.
+    htmls: list[str] = await containers.evaluate_all("els => els.map((el) => el.outerHTML)")
+    parsed = [_parse_result_group(html) for html in htmls]
+    results = [group for group, _ in parsed]
+
+    if selectable_numbers:
+        for idx, group in enumerate(results):
+            cards_to_click = [
+                j
+                for j, flight in enumerate(group["flight_details"])
+                if flight["airline_flight_number"]
+                and any(
+                    variant in selectable_numbers
+                    for variant in _flight_number_variants(flight["airline_flight_number"])
+                )
+            ]
+            flight_cards = containers.nth(idx).locator(parsed[idx][1])
+            for offset, idx_to_click in enumerate(cards_to_click):
+                try:
+                    await flight_cards.nth(max(0, idx_to_click - offset)).click()
+                    await page.wait_for_timeout(250)
+                except Exception:
+                    continue
 
     return results
 
@@ -203,11 +353,32 @@ async def close_date_selection_ui(page):
     if await close_date_button.count():
         try:
             await close_date_button.click()
-            await page.wait_for_timeout(500)
+            await close_date_button.first.wait_for(state="hidden", timeout=2000)
         except Exception:
             pass
 
 
+# Uses the native value setter so React-controlled inputs pick up the change, then re-reads
+# the value after a microtask in case the component reverted it.
+_SET_VALUE_JS = """
+async (el, val) => {
+  el.focus();
+  const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), "value")?.set;
+  if (setter) {
+    setter.call(el, "");
+    setter.call(el, val);
+  } else {
+    el.value = val;
+  }
+  el.dispatchEvent(new Event("input", { bubbles: true }));
+  el.dispatchEvent(new Event("change", { bubbles: true }));
+  el.blur();
+  await Promise.resolve();
+  return el.value;
+}
+"""
+
+
 async def _set_value_direct(page, selector: str, value: str) -> None:
     await close_date_selection_ui(page)
 
@@ -217,41 +388,43 @@ async def _set_value_direct(page, selector: str, value: str) -> None:
     field = page.locator(selector).first
     if not await field.count():
         return
+
     try:
-        await field.click()
+        current = await field.evaluate(_SET_VALUE_JS, value)
     except Exception:
-        pass
-
-    await close_date_selection_ui(page)
-
-    for combo in ("Meta+A", "Control+A"):
-        try:
-            await field.press(combo)
-            await field.press("Backspace")
-            break
-        except Exception:
-            continue
+        current = ""
+    if current.strip() == value.strip():
+        return
 
+    # The component rejected direct assignment; fall back to Playwright input, then typing.
     try:
-        await page.keyboard.type(value, delay=90)
+        await field.click()
+        await close_date_selection_ui(page)
+        await field.fill(value)
+        if (await field.input_value()).strip() != value.strip():
+            await field.fill("")
+            await page.keyboard.type(value, delay=40)
         await field.press("Tab")
     except Exception:
         pass
-    await page.wait_for_timeout(200)
-    try:
-        current = await field.input_value()
-        if current.strip() != value.strip():
-            await field.evaluate(
-                """
-                    (el, val) => { el.value = val;
-                    el.dispatchEvent(new Event('input', { bubbles: true }));
-                    "el.dispatchEvent(new Event('change', { bubbles: true })); el.blur(); }
-                """,
-                value,
-            )
-    except Exception:
-        pass
-    await page.wait_for_timeout(200)
+
+
+# Clicks the month arrow n times in-page (negative n goes back), letting React repaint between clicks.
+_CALENDAR_NAV_JS = """
+async (root, n) => {
+  const arrow = root.querySelector(
+    n > 0 ? ".react-calendar__navigation__next-button" : ".react-calendar__navigation__prev-button"
+  );
+  const label = () => root.querySelector(".react-calendar__navigation__label__labelText--from")?.textContent;
+  for (let i = 0; i < Math.abs(n) && arrow; i++) {
+    const previous = label();
+    arrow.click();
+    for (let frame = 0; frame < 30 && label() === previous; frame++) {
+      await new Promise((resolve) => requestAnimationFrame(resolve));
+    }
+  }
+}
+"""
 
 
 async def _pick_date_from_calendar(page, field_selector: str, date_str: str) -> None:
@@ -295,14 +468,10 @@ async def _pick_date_from_calendar(page, field_selector: str, date_str: str) ->
             delta_months = (target.year - current_month.year) * 12 + (target.month - current_month.month)
             steps = min(abs(delta_months), 18)
             if delta_months != 0:
-                next_arrow = calendar.locator(".react-calendar__navigation__next-button").first
-                prev_arrow = calendar.locator(".react-calendar__navigation__prev-button").first
-                for _ in range(steps):
-                    if delta_months > 0 and await next_arrow.count():
-                        await next_arrow.click()
-                    elif delta_months < 0 and await prev_arrow.count():
-                        await prev_arrow.click()
-                    await page.wait_for_timeout(120)
+                await calendar.evaluate(_CALENDAR_NAV_JS, steps if delta_months > 0 else -steps)
+                label_text = (await label_loc.inner_text()).strip()
+                if _parse_label(label_text) != target.replace(day=1):
+                    logger.debug("Calendar shows %s after navigating towards %s", label_text, date_str)
     except Exception:
         pass
 
@@ -326,9 +495,26 @@ async def _pick_date_from_calendar(page, field_selector: str, date_str: str) ->
         return
 
     await close_date_selection_ui(page)
-    await page.wait_for_timeout(250)
 
-async def _expand_all_flight_cards(page) -> None:
+
+async def _target_card_rendered(page, target_variants: set[str]) -> bool:
+    try:
+        numbers = await page.evaluate(
+            "sel => [...document.querySelectorAll(sel)].map(e => e.innerText.trim())",
+            "div.css-ceo8c9 p.chakra-text.css-1m9eb7l",
+        )
+    except Exception:
+        return False
+    return any(_flight_number_variants(number) & target_variants for number in numbers or [])
+
+
+async def _expand_all_flight_cards(page, flight_number: str | None = None) -> None:
+    """
+    Expand collapsed result sections. With a flight_number filter, stop as soon as the target card is rendered.
+    """
+    target_variants = _flight_number_variants(flight_number)
+    if target_variants and await _target_card_rendered(page, target_variants):
+        return
     sections = page.locator("div.css-1xjwpnn")
     count = await sections.count()
     for idx in range(count):
@@ -339,144 +525,127 @@ async def _expand_all_flight_cards(page) -> None:
                 await button.click()
                 await page.wait_for_timeout(300)
             except Exception:
-                pass
+                continue
+            if target_variants and await _target_card_rendered(page, target_variants):
+                return
+
+
+_SCRAPE_FLIGHT_CARDS_JS = """
+() => {
+  const text = (node) => (node ? node.innerText.trim() : "");
+  const texts = (nodes) => [...nodes].map((node) => node.innerText.trim());
+  const groups = [...document.querySelectorAll("div.css-ceo8c9")];
+  return groups.flatMap((group) =>
+    [...group.querySelectorAll(":scope > div.css-0")].map((card) => ({
+      airline: (card.querySelector("img[alt]")?.getAttribute("alt") ?? "").trim(),
+      flight_number: text(card.querySelector("p.chakra-text.css-1m9eb7l")),
+      date: text(card.querySelector("p.chakra-text.css-1tzeee1")),
+      day: text(card.querySelector("p.chakra-text.css-zjgxih")),
+      origin: text(card.querySelector("p.chakra-text.css-2plwd4")),
+      destination: text(card.querySelector("div.chakra-stack.css-2wo2bk > div.css-0:nth-of-type(2) p")),
+      details: texts(card.querySelectorAll("div.chakra-stack.css-emtrgo p.chakra-text.css-epvm6")),
+      times: texts(card.querySelectorAll("div.chakra-stack.css-1y1yqzu p.chakra-text.css-epvm6")),
+      seats: [...card.querySelectorAll("div.css-1j8r2w0 div.chakra-stat__group.css-1mpfoc5 > div")].map((block) => {
+        const valueNode = block.querySelector(
+          "dd.chakra-stat__number.css-ia7pv7, dd.chakra-stat__number.css-pwhod9, dd.chakra-stat__number.css-1axeus7"
+        );
+        const labelNode = block.querySelector(
+          "dd.chakra-stat__help-text.css-dw3d13, dd.chakra-stat__help-text.css-1dyk2dh"
+        );
+        return {
+          value: valueNode ? valueNode.textContent.trim() : "",
+          label: labelNode ? labelNode.textContent.trim() : "",
+        };
+      }),
+    }))
+  );
+}
+"""
+
+# Seat stat labels with spaces stripped and upper-cased, mapped to the seats dict keys.
+_SEAT_LABEL_MAP = {
+    "FIRST": "first",
+    "BUS": "bus",
+    "ECO": "eco",
+    "ECO+": "eco_plus",
+    "ECOPLUS": "eco_plus",
+    "NON-REV": "non_rev",
+    "NONREV": "non_rev",
+}
+
+
+def _flight_record_from_card(card: dict) -> dict:
+    def safe_strip(val) -> str:
+        """Returns a stripped string if valid, otherwise an empty string."""
+        return val.strip() if isinstance(val, str) else ""
+
+    details = [t.strip() for t in card.get("details") or [] if isinstance(t, str)]
+    times = [t.strip() for t in card.get("times") or [] if isinstance(t, str)]
+
+    seats = {
+        "first": "",
+        "bus": "",
+        "eco": "",
+        "eco_plus": "",
+        "non_rev": "",
+    }
+    for seat in card.get("seats") or []:
+        key = _SEAT_LABEL_MAP.get(seat.get("label", "").replace(" ", "").upper())
+        if key:
+            seats[key] = seat.get("value", "")
+
+    return {
+        "airline": safe_strip(card.get("airline")),
+        "flight_number": safe_strip(card.get("flight_number")),
+        "date": safe_strip(card.get("date")),
+        "day": safe_strip(card.get("day")),
+        "origin": safe_strip(card.get("origin")),
+        "destination": safe_strip(card.get("destination")),
+        "aircraft": details[0] if details else "",
+        "duration": details[1] if len(details) > 1 else "",
+        "departure_time": times[0] if times else "",
+        "arrival_time": times[1] if len(times) > 1 else "",
+        "seats": seats,
+    }
 
 
 async def _scrape_all_flights(page, flight_number: str | None = None) -> list[dict]:
+    """
+    Extract every flight card in one page.evaluate round-trip, then normalize in Python.
+    """
+    try:
+        cards = await page.evaluate(_SCRAPE_FLIGHT_CARDS_JS)
+    except Exception:
+        logger.warning("Failed to extract StaffTraveler flight cards", exc_info=True)
+        return []
+
     results = []
     target_variants = _flight_number_variants(flight_number)
-    groups = page.locator("div.css-ceo8c9")
-    group_count = await groups.count()
-    for i in range(group_count):
-        group = groups.nth(i)
-        cards = group.locator(":scope > div.css-0")
-        card_count = await cards.count()
-        for j in range(card_count):
-            card = cards.nth(j)
-
-            airline_task = card.locator("img[alt]").first.get_attribute("alt")
-            flight_number_task = card.locator("p.chakra-text.css-1m9eb7l").first.inner_text()
-            date_task = card.locator("p.chakra-text.css-1tzeee1").first.inner_text()
-            day_task = card.locator("p.chakra-text.css-zjgxih").first.inner_text()
-            origin_task = card.locator("p.chakra-text.css-2plwd4").first.inner_text()
-            destination_task = card.locator(
-                "div.chakra-stack.css-2wo2bk > div.css-0:nth-of-type(2) p"
-            ).first.inner_text()
-            details_task = card.locator("div.chakra-stack.css-emtrgo p.chakra-text.css-epvm6").all_inner_texts()
-            times_task = card.locator("div.chakra-stack.css-1y1yqzu p.chakra-text.css-epvm6").all_inner_texts()
-
-            (
-                airline_raw,
-                flight_number_raw,
-                date_raw,
-                day_raw,
-                origin_raw,
-                destination_raw,
-                details_raw,
-                times_raw,
-            ) = await asyncio.gather(
-                airline_task,
-                flight_number_task,
-                date_task,
-                day_task,
-                origin_task,
-                destination_task,
-                details_task,
-                times_task,
-                return_exceptions=True,
-            )
-
-            def safe_strip(val) -> str:
-                """Returns a stripped string if valid, otherwise an empty string."""
-                return val.strip() if isinstance(val, str) else ""
-
-            # Apply to your fields
-            airline = safe_strip(airline_raw)
-            flight_number = safe_strip(flight_number_raw)
-            date_text = safe_strip(date_raw)
-            day_text = safe_strip(day_raw)
-            origin = safe_strip(origin_raw)
-            destination = safe_strip(destination_raw)
-
-            aircraft = ""
-            duration = ""
-            details = details_raw if isinstance(details_raw, list) else []
-            details = [t.strip() for t in details if isinstance(t, str)]
-            if details:
-                aircraft = details[0]
-            if len(details) > 1:
-                duration = details[1]
-
-            depart_time = ""
-            arrive_time = ""
-            times = times_raw if isinstance(times_raw, list) else []
-            times = [t.strip() for t in times if isinstance(t, str)]
-            if times:
-                depart_time = times[0]
-            if len(times) > 1:
-                arrive_time = times[1]
-
-            seats = {
-                "first": "",
-                "bus": "",
-                "eco": "",
-                "eco_plus": "",
-                "non_rev": "",
-            }
-            try:
-                seat_data = await card.locator("div.css-1j8r2w0 div.chakra-stat__group.css-1mpfoc5 > div").evaluate_all(
-                    """blocks => blocks.map(block => {
-                        const valueNode = block.querySelector(
-                          "dd.chakra-stat__number.css-ia7pv7, dd.chakra-stat__number.css-pwhod9, dd.chakra-stat__number.css-1axeus7"
-                        );
-                        const labelNode = block.querySelector(
-                          "dd.chakra-stat__help-text.css-dw3d13, dd.chakra-stat__help-text.css-1dyk2dh"
-                        );
-                        return {
-                          value: valueNode ? valueNode.textContent.trim() : "",
-                          label: labelNode ? labelNode.textContent.trim() : "",
-                        };
-                      })"""  # noqa: E501
-                )
-            except Exception:
-                seat_data = []
-
-            for seat in seat_data:
-                label_norm = seat.get("label", "").replace(" ", "").upper()
-                value_text = seat.get("value", "")
-                if label_norm in {"FIRST"}:
-                    seats["first"] = value_text
-                elif label_norm in {"BUS"}:
-                    seats["bus"] = value_text
-                elif label_norm in {"ECO"}:
-                    seats["eco"] = value_text
-                elif label_norm in {"ECO+", "ECOPLUS"}:
-                    seats["eco_plus"] = value_text
-                elif label_norm in {"NON-REV", "NONREV"}:
-                    seats["non_rev"] = value_text
-
-            flight_record = {
-                "airline": airline,
-                "flight_number": flight_number,
-                "date": date_text,
-                "day": day_text,
-                "origin": origin,
-                "destination": destination,
-                "aircraft": aircraft,
-                "duration": duration,
-                "departure_time": depart_time,
-                "arrival_time": arrive_time,
-                "seats": seats,
-            }
-            if target_variants:
-                scraped_variants = _flight_number_variants(flight_number)
-                if scraped_variants & target_variants:
-                    return [flight_record]
-            else:
-                results.append(flight_record)
+    for card in cards or []:
+        flight_record = _flight_record_from_card(card)
+        if target_variants:
+            scraped_variants = _flight_number_variants(flight_record["flight_number"])
+            if scraped_variants & target_variants:
+                return [flight_record]
+        else:
+            results.append(flight_record)
     return results
 
 
+async def _add_flight_leg(page, add_btn: Locator, containers: Locator, idx: int) -> bool:
+    """
+    Click "Add flight" and wait for the leg container at idx to mount.
+    """
+    if not await add_btn.count():
+        return False
+    await add_btn.click()
+    try:
+        await containers.nth(idx).wait_for(state="attached", timeout=2000)
+    except PlaywrightTimeout:
+        await page.wait_for_selector(config.STAFF_FLIGHT_CONTAINER)
+    return True
+
+
 async def perform_flight_search(
     page,
     input_data: dict,
@@ -491,36 +660,40 @@ async def perform_flight_search(
 
     await page.wait_for_selector(config.STAFF_FLIGHT_CONTAINER)
 
+    containers = page.locator(config.STAFF_FLIGHT_CONTAINER)
+    add_btn = page.locator(config.STAFF_ADD_FLIGHT_BUTTON).first
+    from_selectors = _leg_selectors(config.STAFF_FROM, config.STAFF_FROM_TEMPLATE, len(trips))
+    to_selectors = _leg_selectors(config.STAFF_TO, config.STAFF_TO_TEMPLATE, len(trips))
+    date_selectors = _leg_selectors(config.STAFF_DATE, config.STAFF_DATE_TEMPLATE, len(trips))
+    container_count = await containers.count()
+
     for idx, trip in enumerate(trips):
-        containers = page.locator(config.STAFF_FLIGHT_CONTAINER)
-        if await containers.count() <= idx:
-            add_btn = page.locator(config.STAFF_ADD_FLIGHT_BUTTON).first
-            if await add_btn.count():
-                await add_btn.click()
-                await page.wait_for_timeout(500)
-                await page.wait_for_selector(config.STAFF_FLIGHT_CONTAINER)
+        if container_count <= idx and await _add_flight_leg(page, add_btn, containers, idx):
+            container_count = idx + 1
 
         origin = trip.get("origin", "")
         dest = trip.get("destination", "")
         leg = itinerary[idx] if idx < len(itinerary) else {}
 
-        await _fill_autosuggest_field(page, config.STAFF_FROM_TEMPLATE.format(index=idx), origin)
-        await _fill_autosuggest_field(page, config.STAFF_TO_TEMPLATE.format(index=idx), dest)
-        await _pick_date_from_calendar(page, config.STAFF_DATE_TEMPLATE.format(index=idx), leg.get("date", ""))
-        await page.wait_for_timeout(400)
+        if config.STAFF_PARALLEL_AUTOSUGGEST:
+            await asyncio.gather(
+                _fill_autosuggest_field(page, from_selectors[idx], origin),
+                _fill_autosuggest_field(page, to_selectors[idx], dest),
+            )
+        else:
+            await _fill_autosuggest_field(page, from_selectors[idx], origin)
+            await _fill_autosuggest_field(page, to_selectors[idx], dest)
+        # The date picker shares one calendar overlay, so it always runs after the airports.
+        await _pick_date_from_calendar(page, date_selectors[idx], leg.get("date", ""))
 
-        if idx < len(trips) - 1:
-            add_btn = page.locator(config.STAFF_ADD_FLIGHT_BUTTON).first
-            if await add_btn.count():
-                await add_btn.click()
-                await page.wait_for_timeout(500)
-                await page.wait_for_selector(config.STAFF_FLIGHT_CONTAINER)
+        if idx < len(trips) - 1 and await _add_flight_leg(page, add_btn, containers, idx + 1):
+            container_count = idx + 2
 
     search_btn = page.locator(config.STAFF_SEARCH_BUTTON).first
     if not await search_btn.count():
         raise SystemExit("Could not find Search flights button.")
     await search_btn.click()
-    await page.wait_for_timeout(1500)
+    # _scrape_results waits for the results container to become visible.
     if progress_cb:
         await progress_cb(50, "submitted")
 
@@ -528,11 +701,188 @@ async def perform_flight_search(
     if progress_cb:
         await progress_cb(85, "parsed")
     if output_path:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(json.dumps(results, indent=2))
+        await _write_results(output_path, results)
     return results
 
 
+async def _capture_screenshot(
+    page, screenshot: str | None, progress_cb: Callable[[int, str], Awaitable[None]] | None
+) -> None:
+    if not screenshot:
+        return
+    try:
+        screenshot_path = Path(screenshot)
+        _ensure_dir(screenshot_path.parent)
+        await page.screenshot(path=str(screenshot_path), full_page=True)
+        if progress_cb:
+            await progress_cb(95, "screenshot")
+    except Exception:
+        pass
+
+
+async def _write_results(output_path: Path, results: list[dict[str, Any]]) -> None:
+    _ensure_dir(output_path.parent)
+    payload = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+    await asyncio.to_thread(output_path.write_bytes, payload)
+    logger.info("StaffTraveler results written to %s", output_path)
+
+
+_storage_state_digests: dict[Path, bytes] = {}
+
+
+def _storage_state_path(username: str) -> Path:
+    digest = hashlib.sha256(username.lower().encode()).hexdigest()[:16]
+    return config.STAFF_STORAGE_STATE_DIR / f"{digest}.json"
+
+
+def _storage_state_is_fresh(path: Path) -> bool:
+    try:
+        return time.time() - path.stat().st_mtime < config.STAFF_STORAGE_STATE_MAX_AGE
+    except OSError:
+        return False
+
+
+async def _session_is_valid(page) -> bool:
+    """
+    Open the home page with restored cookies and check that we are not bounced to login.
+    """
+    try:
+        await page.goto("https://stafftraveler.app", wait_until="domcontentloaded")
+    except Exception:
+        return False
+    await _wait_for_authenticated_ui(page)
+    return "login" not in page.url.lower()
+
+
+async def _wait_for_authenticated_ui(page) -> None:
+    """
+    Wait for the signed-in search form, falling back to network quiet if it never renders.
+    """
+    try:
+        await page.wait_for_selector(_AUTHENTICATED_MARKERS, state="visible", timeout=8000)
+        return
+    except PlaywrightTimeout:
+        pass
+    try:
+        await page.wait_for_load_state("networkidle", timeout=4000)
+    except PlaywrightTimeout:
+        pass
+
+
+def _replace_file(path: Path, payload: bytes) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+async def _save_storage_state(context, path: Path) -> None:
+    """
+    Persist cookies/localStorage, rewriting the file only when they changed since the last save.
+    """
+    try:
+        payload = orjson.dumps(await context.storage_state())
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        if _storage_state_digests.get(path) == digest and path.exists():
+            # Unchanged: just bump the mtime that _storage_state_is_fresh reads.
+            await asyncio.to_thread(os.utime, path)
+            return
+        _ensure_dir(path.parent)
+        await asyncio.to_thread(_replace_file, path, payload)
+        _storage_state_digests[path] = digest
+    except Exception:
+        logger.debug("Could not persist StaffTraveler session", exc_info=True)
+
+
+async def _login(
+    page,
+    username: str,
+    password: str,
+    progress_cb: Callable[[int, str], Awaitable[None]] | None = None,
+) -> None:
+    await page.goto(LOGIN_URL, wait_until="domcontentloaded")
+    if progress_cb:
+        await progress_cb(15, "loaded")
+    email_field = await _wait_for_first_locator(page, _EMAIL_SELECTORS, timeout_ms=12000)
+
+    if not email_field:
+        raise SystemExit("Could not find email address field")
+    # Banners mount with the rest of the client app, so check once the form is there.
+    await _dismiss_banners(page)
+
+    await email_field.click()
+    await email_field.fill("")
+    await email_field.type(username)
+
+    btn_continue = await _wait_for_first_locator(page, _CONTINUE_SELECTORS, timeout_ms=6000)
+    if btn_continue:
+        await btn_continue.click()
+
+    password_field = await _wait_for_first_locator(page, _PASSWORD_SELECTORS, timeout_ms=12000)
+
+    if not email_field or not password_field:
+        raise SystemExit("Could not find password field")
+
+    await password_field.click()
+    await password_field.fill("")
+    await password_field.type(password)
+
+    login_button = await _first_locator(page, _LOGIN_BUTTON_SELECTORS)
+    if login_button:
+        await login_button.click()
+    else:
+        await password_field.press("Enter")
+
+    try:
+        await page.wait_for_url(lambda url: "login" not in url, timeout=5000)
+    except PlaywrightTimeout:
+        pass
+
+    # Need to revisit this URL to remove the login wrapper
+    await page.goto("https://stafftraveler.app")
+
+    await _wait_for_authenticated_ui(page)
+
+    if "login" in page.url.lower():
+        error_text = ""
+        possible_errors = page.locator(_LOGIN_ERROR_SELECTOR)
+        if await possible_errors.count():
+            try:
+                error_text = (await possible_errors.first.inner_text()).strip()
+            except Exception:
+                error_text = ""
+        raise SystemExit(
+            f"Login appears to have failed (still on login page).{f' Error: {error_text}' if error_text else ''}"
+        )
+
+
+async def warm_session(headless: bool, username: str | None = None, password: str | None = None) -> None:
+    """
+    Log in and persist the StaffTraveler session so a later search starts from a fresh storage_state.
+    """
+    try:
+        username, password = _resolve_credentials(username, password)
+        storage_path = _storage_state_path(username)
+        if _storage_state_is_fresh(storage_path):
+            return
+        context = await browser_pool.get_context(
+            "stafftraveler",
+            headless=headless,
+            args=STAFF_LAUNCH_ARGS,
+            user_agent=STEALTH_UA,
+            viewport={"width": 1280, "height": 900},
+        )
+        try:
+            await context.add_init_script("Object.defineProperty(navigator, 'webdriver', { get: () => undefined });")
+            page = await context.new_page()
+            await _login(page, username, password)
+            await _save_storage_state(context, storage_path)
+        finally:
+            await browser_pool.release(context)
+    except (Exception, SystemExit) as exc:
+        # _login reports failures as SystemExit; the real run logs in again and surfaces them.
+        logger.warning("StaffTraveler session warm-up failed: %s", exc)
+
+
 async def perform_stafftraveller_login(
     headless: bool,
     screenshot: str | None,
@@ -543,144 +893,68 @@ async def perform_stafftraveller_login(
     progress_cb: Callable[[int, str], Awaitable[None]] | None = None,
 ) -> list[dict[str, Any]]:
     logger.info("Starting StaffTraveler login headless=%s", headless)
-    username = username or os.getenv("ST_USERNAME")
-    password = password or os.getenv("ST_PASSWORD")
-    if not username or not password:
-        raise SystemExit("Set ST_USERNAME and ST_PASSWORD in your environment before running.")
+    username, password = _resolve_credentials(username, password)
 
-    async with async_playwright() as p:
-        if progress_cb:
-            await progress_cb(5, "launching")
-        browser = await p.chromium.launch(
-            headless=headless,
-            args=["--disable-blink-features=AutomationControlled"],
-        )
-        context = await browser.new_context(
-            user_agent=STEALTH_UA,
-            viewport={"width": 1280, "height": 900},
-        )
+    if progress_cb:
+        await progress_cb(5, "launching")
+    storage_path = _storage_state_path(username)
+    has_session = _storage_state_is_fresh(storage_path)
+    context = await browser_pool.get_context(
+        "stafftraveler",
+        headless=headless,
+        args=STAFF_LAUNCH_ARGS,
+        storage_state=storage_path if has_session else None,
+        user_agent=STEALTH_UA,
+        viewport={"width": 1280, "height": 900},
+    )
+    try:
         await context.add_init_script("Object.defineProperty(navigator, 'webdriver', { get: () => undefined });")
         page = await context.new_page()
 
-        await page.goto(LOGIN_URL, wait_until="domcontentloaded")
-        if progress_cb:
-            await progress_cb(15, "loaded")
-        await page.wait_for_timeout(800)  # allow client-side scripts to mount
-        await _dismiss_banners(page)
-
-        email_field = await _wait_for_first_locator(
-            page,
-            [
-                'input[name="email"]',
-                'input[type="email"]',
-                'input[autocomplete="email"]',
-                'input[placeholder*="email" i]',
-                'input[id*="email" i]',
-            ],
-            timeout_ms=12000,
-        )
-
-        if not email_field:
-            raise SystemExit("Could not find email address field")
-
-        await email_field.click()
-        await email_field.fill("")
-        await email_field.type(username)
-
-        btn_continue = await _wait_for_first_locator(
-            page,
-            ["#continue", 'button[type="button"]'],
-            timeout_ms=6000,
-        )
-        if btn_continue:
-            await btn_continue.click()
-        await page.wait_for_timeout(1200)
-
-        password_field = await _wait_for_first_locator(
-            page,
-            [
-                'input[name="password"]',
-                'input[type="password"]',
-                'input[autocomplete="current-password"]',
-                'input[placeholder*="password" i]',
-                'input[id*="password" i]',
-            ],
-            timeout_ms=12000,
-        )
-
-        if not email_field or not password_field:
-            raise SystemExit("Could not find password field")
-
-        await password_field.click()
-        await password_field.fill("")
-        await password_field.type(password)
-
-        login_button = await _first_locator(
-            page,
-            ["#login-with-password"],
-        )
-        if login_button:
-            await login_button.click()
+        if has_session and await _session_is_valid(page):
+            logger.info("Reusing saved StaffTraveler session")
+            if progress_cb:
+                await progress_cb(15, "loaded")
         else:
-            await password_field.press("Enter")
-
-        try:
-            await page.wait_for_url(lambda url: "login" not in url, timeout=5000)
-        except PlaywrightTimeout:
-            pass
-
-        # Need to revisit this URL to remove the login wrapper
-        await page.goto("https://stafftraveler.app")
+            await _login(page, username, password, progress_cb)
 
-        try:
-            await page.wait_for_load_state("networkidle", timeout=8000)
-        except PlaywrightTimeout:
-            # Fall back to a short wait if the page keeps streaming.
-            await page.wait_for_timeout(1500)
-        await page.wait_for_timeout(1200)
-
-        if "login" in page.url.lower():
-            error_text = ""
-            possible_errors = page.locator(
-                ".error, .alert, [data-testid*='error' i], [role='alert'], [class*='error' i]"
-            )
-            if await possible_errors.count():
-                try:
-                    error_text = (await possible_errors.first.inner_text()).strip()
-                except Exception:
-                    error_text = ""
-            raise SystemExit(
-                f"Login appears to have failed (still on login page).{f' Error: {error_text}' if error_text else ''}"
-            )
-
-        await _expand_all_flight_cards(page)
-        if progress_cb:
-            await progress_cb(70, "results loaded")
         raw_number = (input_data or {}).get("flight_number")
         target_number = raw_number.upper() if isinstance(raw_number, str) else raw_number
+        await _expand_all_flight_cards(page, flight_number=target_number)
+        if progress_cb:
+            await progress_cb(70, "results loaded")
         results = await _scrape_all_flights(page, flight_number=target_number)
         if progress_cb:
             await progress_cb(85, "parsed")
+        pending = [
+            _capture_screenshot(page, screenshot, progress_cb),
+            _save_storage_state(context, storage_path),
+        ]
         if output_path:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(json.dumps(results, indent=2))
-            logger.info("StaffTraveler results written to %s", output_path)
+            pending.append(_write_results(output_path, results))
+        await asyncio.gather(*pending)
 
-        if screenshot:
-            try:
-                screenshot_path = Path(screenshot)
-                screenshot_path.parent.mkdir(parents=True, exist_ok=True)
-                await page.screenshot(path=str(screenshot_path), full_page=True)
-                if progress_cb:
-                    await progress_cb(95, "screenshot")
-            except Exception:
-                pass
+    finally:
+        await browser_pool.release(context)
+    if progress_cb:
+        await progress_cb(100, "done")
+    return results
 
-        await browser.close()
-        if progress_cb:
-            await progress_cb(100, "done")
-        return results
-    return []
+
+def _is_staff_request_response(response) -> bool:
+    return response.request.method == "POST" and bool(_STAFF_REQUEST_URL_RE.search(response.url))
+
+
+async def _click_and_wait_for_request(page, button: Locator, timeout_ms: int = 10000) -> None:
+    """
+    Click the request button and wait for StaffTraveler to answer the request POST.
+    Raises PlaywrightTimeout if no answer arrives within timeout_ms, RuntimeError on a non-2xx answer.
+    """
+    async with page.expect_response(_is_staff_request_response, timeout=timeout_ms) as response_info:
+        await button.click()
+    response = await response_info.value
+    if not response.ok:
+        raise RuntimeError(f"StaffTraveler request POST failed with HTTP {response.status}")
 
 
 async def perform_stafftraveller_search(
@@ -695,113 +969,30 @@ async def perform_stafftraveller_search(
     request_state: dict[str, Any] | None = None,
 ) -> list[dict[str, Any]]:
     logger.info("Starting StaffTraveler search headless=%s", headless)
-    username = username or os.getenv("ST_USERNAME")
-    password = password or os.getenv("ST_PASSWORD")
-    if not username or not password:
-        raise SystemExit("Set ST_USERNAME and ST_PASSWORD in your environment before running.")
+    username, password = _resolve_credentials(username, password)
 
-    async with async_playwright() as p:
-        if progress_cb:
-            await progress_cb(5, "launching")
-        browser = await p.chromium.launch(
-            headless=headless,
-            args=["--disable-blink-features=AutomationControlled"],
-        )
-        context = await browser.new_context(
-            user_agent=STEALTH_UA,
-            viewport={"width": 1280, "height": 900},
-        )
+    if progress_cb:
+        await progress_cb(5, "launching")
+    storage_path = _storage_state_path(username)
+    has_session = _storage_state_is_fresh(storage_path)
+    context = await browser_pool.get_context(
+        "stafftraveler",
+        headless=headless,
+        args=STAFF_LAUNCH_ARGS,
+        storage_state=storage_path if has_session else None,
+        user_agent=STEALTH_UA,
+        viewport={"width": 1280, "height": 900},
+    )
+    try:
         await context.add_init_script("Object.defineProperty(navigator, 'webdriver', { get: () => undefined });")
         page = await context.new_page()
 
-        await page.goto(LOGIN_URL, wait_until="domcontentloaded")
-        if progress_cb:
-            await progress_cb(15, "loaded")
-        await page.wait_for_timeout(800)
-        await _dismiss_banners(page)
-
-        email_field = await _wait_for_first_locator(
-            page,
-            [
-                'input[name="email"]',
-                'input[type="email"]',
-                'input[autocomplete="email"]',
-                'input[placeholder*="email" i]',
-                'input[id*="email" i]',
-            ],
-            timeout_ms=12000,
-        )
-
-        if not email_field:
-            raise SystemExit("Could not find email address field")
-
-        await email_field.click()
-        await email_field.fill("")
-        await email_field.type(username)
-
-        btn_continue = await _wait_for_first_locator(
-            page,
-            ["#continue", 'button[type="button"]'],
-            timeout_ms=6000,
-        )
-        if btn_continue:
-            await btn_continue.click()
-        await page.wait_for_timeout(1200)
-
-        password_field = await _wait_for_first_locator(
-            page,
-            [
-                'input[name="password"]',
-                'input[type="password"]',
-                'input[autocomplete="current-password"]',
-                'input[placeholder*="password" i]',
-                'input[id*="password" i]',
-            ],
-            timeout_ms=12000,
-        )
-
-        if not email_field or not password_field:
-            raise SystemExit("Could not find password field")
-
-        await password_field.click()
-        await password_field.fill("")
-        await password_field.type(password)
-
-        login_button = await _first_locator(
-            page,
-            ["#login-with-password"],
-        )
-        if login_button:
-            await login_button.click()
+        if has_session and await _session_is_valid(page):
+            logger.info("Reusing saved StaffTraveler session")
+            if progress_cb:
+                await progress_cb(15, "loaded")
         else:
-            await password_field.press("Enter")
-
-        try:
-            await page.wait_for_url(lambda url: "login" not in url, timeout=5000)
-        except PlaywrightTimeout:
-            pass
-
-        await page.goto("https://stafftraveler.app")
-
-        try:
-            await page.wait_for_load_state("networkidle", timeout=8000)
-        except PlaywrightTimeout:
-            await page.wait_for_timeout(1500)
-        await page.wait_for_timeout(1200)
-
-        if "login" in page.url.lower():
-            error_text = ""
-            possible_errors = page.locator(
-                ".error, .alert, [data-testid*='error' i], [role='alert'], [class*='error' i]"
-            )
-            if await possible_errors.count():
-                try:
-                    error_text = (await possible_errors.first.inner_text()).strip()
-                except Exception:
-                    error_text = ""
-            raise SystemExit(
-                f"Login appears to have failed (still on login page).{f' Error: {error_text}' if error_text else ''}"
-            )
+            await _login(page, username, password, progress_cb)
 
         results: list[dict[str, Any]] = []
         if input_data:
@@ -823,10 +1014,13 @@ async def perform_stafftraveller_search(
                         if request_state is not None:
                             request_state.update({"posted": False, "reason": "disabled"})
                     else:
-                        await request_btn.click()
-                        await page.wait_for_timeout(10000)
+                        await _click_and_wait_for_request(page, request_btn)
                         if request_state is not None:
                             request_state.update({"posted": True, "reason": None})
+                except PlaywrightTimeout:
+                    logger.warning("StaffTraveler request POST was not answered in time")
+                    if request_state is not None and "posted" not in request_state:
+                        request_state.update({"posted": False, "reason": "timeout"})
                 except Exception:
                     if request_state is not None and "posted" not in request_state:
                         request_state.update({"posted": False, "reason": "error"})
@@ -836,24 +1030,19 @@ async def perform_stafftraveller_search(
             try:
                 await page.reload()
                 await page.wait_for_load_state("networkidle", timeout=8000)
-            except Exception:
-                await page.wait_for_timeout(1500)
-
-        if screenshot:
-            try:
-                screenshot_path = Path(screenshot)
-                screenshot_path.parent.mkdir(parents=True, exist_ok=True)
-                await page.screenshot(path=str(screenshot_path), full_page=True)
-                if progress_cb:
-                    await progress_cb(95, "screenshot")
             except Exception:
                 pass
 
-        await browser.close()
-        if progress_cb:
-            await progress_cb(100, "done")
-        return results
-    return []
+        await asyncio.gather(
+            _capture_screenshot(page, screenshot, progress_cb),
+            _save_storage_state(context, storage_path),
+        )
+
+    finally:
+        await browser_pool.release(context)
+    if progress_cb:
+        await progress_cb(100, "done")
+    return results
 
 
 def _normalize_flight_number(value: str | None) -> str:
@@ -956,10 +1145,9 @@ async def update_selectable_flights(
         progress_cb=progress_cb,
     )
 
-    staff_by_number: dict[str, dict[str, Any]] = {}
-    for item in results:
-        for variant in _flight_number_variants(item.get("flight_number")):
-            staff_by_number[variant] = item
+    staff_by_number: dict[str, dict[str, Any]] = {
+        variant: item for item in results for variant in _flight_number_variants(item.get("flight_number"))
+    }
 
     for routing in selectable_payload:
         if not isinstance(routing, dict):
@@ -1042,8 +1230,16 @@ async def main() -> None:
     screenshot = args.screenshot or None
 
     input_data = read_input(args.input or "input.json") if args.input else {}
-    await perform_stafftraveller_login(headless=not args.headed, screenshot=screenshot, input_data=input_data)
+    try:
+        await perform_stafftraveller_login(headless=not args.headed, screenshot=screenshot, input_data=input_data)
+    finally:
+        await browser_pool.shutdown()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -15,6 +15,37 @@ BASE_URLS = [
     "https://swa.myidtravel.com/myidtravel/",
     "https://myidtravel.com/myidtravel/",
 ]
+# Saved myIDTravel sessions, one per account; older files are ignored and the bot logs in again
+MYID_STORAGE_STATE_DIR = Path("data/myidtravel_sessions")
+MYID_STORAGE_STATE_MAX_AGE = 4 * 60 * 60  # seconds
+
+# Passed to every Chromium launch: /dev/shm is tiny in containers, and GPU, extensions and
+# background services buy nothing for scraping.
+CHROMIUM_LAUNCH_ARGS = (
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--no-first-run",
+)
+
+# Requests aborted in pooled browser contexts. Only the analytics hosts are matched by the browser;
+# blocking by resource type (e.g. "image,font,media") routes every request through Python and changes
+# what the run screenshots show, so it is opt-in. Keep stylesheets loaded: the bots rely on visibility checks.
+BLOCKED_RESOURCE_TYPES = frozenset(
+    item.strip() for item in os.getenv("BLOCKED_RESOURCE_TYPES", "").split(",") if item.strip()
+)
+BLOCKED_URL_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "intercom.io",
+)
 
 # Base URL used for download links (set ENVIRONMENT=prod to switch)
 ENVIRONMENT = os.getenv("ENVIRONMENT", "dev").strip().lower()
@@ -44,6 +75,15 @@ NONSTOP_FLIGHTS_CONTAINER = ".styles_toggleButtonsWrapper__UrVTR"
 LEG_SELECTOR = "div.styles_dateTimeClassContainer__Fku9u"
 AIRLINE_REASON_CONTAINER = "div.styles_airlineAndReasonContainer__W7fCs"
 ADD_FLIGHT_BUTTON = "div.styles_removeAndAddButtons__qp3Kl"
+AUTOCOMPLETE_OPTION_SELECTOR = '[role="option"]'
+# Fill independent myIDTravel widgets concurrently (airline/travel status, origin/destination);
+# leave off if the dropdowns fight over focus
+MYID_PARALLEL_AUTOCOMPLETE = os.getenv("MYID_PARALLEL_AUTOCOMPLETE", "false").strip().lower() in ("1", "true", "yes")
+# Either means the home page has settled: the search form's airport inputs, or the "not eligible" notice.
+# Generic markers such as a bare select also match the app shell before the form mounts.
+HOME_READY_SELECTOR = (
+    'input[placeholder*="Origin" i], input[placeholder*="Destination" i], :text("eligible for OA travel")'
+)
 
 # Traveller modal
 TRAVELLER_ITEM_SELECTOR = "div.styles_travelSelection_list_element_withoutCollapse__9CVFu"
@@ -84,8 +124,20 @@ STAFF_FLIGHT_CONTAINER = "div.css-1wbljes"
 STAFF_FROM_TEMPLATE = "#from-{index}"
 STAFF_TO_TEMPLATE = "#to-{index}"
 STAFF_DATE_TEMPLATE = "#dates-{index}"
+# Pre-formatted per-leg selectors; legs past STAFF_MAX_LEGS fall back to the templates
+STAFF_MAX_LEGS = 8
+STAFF_FROM = tuple(STAFF_FROM_TEMPLATE.format(index=i) for i in range(STAFF_MAX_LEGS))
+STAFF_TO = tuple(STAFF_TO_TEMPLATE.format(index=i) for i in range(STAFF_MAX_LEGS))
+STAFF_DATE = tuple(STAFF_DATE_TEMPLATE.format(index=i) for i in range(STAFF_MAX_LEGS))
 STAFF_AUTOSUGGEST_INPUT = 'input[aria-autocomplete="list"]'
+STAFF_AUTOSUGGEST_OPTION = '[role="listbox"] [role="option"]'
 STAFF_SEARCH_BUTTON = "button.css-3tlp5u"
 STAFF_RESULTS_CONTAINER = "div.css-1y0bycm"
 STAFF_RESULTS_OUTPUT = Path("json/stafftraveller_results.json")
+STAFF_STORAGE_STATE_DIR = Path("data/stafftraveler_sessions")
+STAFF_STORAGE_STATE_MAX_AGE = 8 * 60 * 60  # seconds
 STAFF_DATE_DONE_BUTTON = "button.css-r7xd4a"
+# Endpoint the "request" button POSTs to; the auto-request only counts as sent once it answers 2xx
+STAFF_REQUEST_URL_PATTERN = os.getenv("STAFF_REQUEST_URL_PATTERN", r"stafftraveler\.app/.*requests?\b")
+# Fill origin/destination autosuggests concurrently; disable if the overlay fights over focus
+STAFF_PARALLEL_AUTOSUGGEST = os.getenv("STAFF_PARALLEL_AUTOSUGGEST", "false").strip().lower() in ("1", "true", "yes")
@@ -1,12 +1,23 @@
+import functools
 import logging
 import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
 from dotenv import load_dotenv
 from sqlalchemy import delete as sa_delete
+from sqlalchemy import event
+from sqlalchemy import insert as sa_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, col, create_engine, desc, select
 
 from app.models import Airline, LookupBotResponse, MyidtravelAccount, Run, StafftravelerAccount, StandbyBotResponse
@@ -18,22 +29,103 @@ logger = logging.getLogger("globalpass.db")
 DEFAULT_DB_PATH = Path("data") / "globalpass.db"
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DEFAULT_DB_PATH}")
 
-connect_args: dict[str, Any] = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
-
-
+_URL = make_url(DATABASE_URL)
+IS_SQLITE = _URL.drivername.startswith("sqlite")
+_SQLITE_DIR = (
+    Path(_URL.database).expanduser().parent if IS_SQLITE and _URL.database and _URL.database != ":memory:" else None
+)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+@functools.cache
 def ensure_data_dir() -> None:
+    """
+    Create the sqlite directory once per process; later calls are no-ops.
+    """
+    if _SQLITE_DIR is None:
+        return
     try:
-        url = make_url(DATABASE_URL)
-        if url.drivername.startswith("sqlite") and url.database:
-            Path(url.database).expanduser().parent.mkdir(parents=True, exist_ok=True)
+        _SQLITE_DIR.mkdir(parents=True, exist_ok=True)
     except Exception as exc:
         logger.warning("Failed to ensure sqlite directory: %s", exc)
 
 
+ensure_data_dir()
+
+
+def _json_serializer(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+connect_args: dict[str, Any] = {}
+# JSON columns (run inputs, bot payloads) go through orjson instead of the stdlib encoder.
+engine_kwargs: dict[str, Any] = {
+    "pool_pre_ping": True,
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+}
+if IS_SQLITE:
+    connect_args = {"check_same_thread": False, "timeout": 30}
+    if ":memory:" not in DATABASE_URL:
+        engine_kwargs.update(poolclass=QueuePool, pool_size=5, max_overflow=10)
+
+engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args, **engine_kwargs)
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _set_sqlite_query_only(dbapi_connection: Any, _connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+read_engine = engine
+if IS_SQLITE and ":memory:" not in DATABASE_URL:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    # Readers get their own pool; under WAL they do not block on (or get blocked by) the writer.
+    read_engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args, **engine_kwargs)
+    event.listen(read_engine, "connect", _set_sqlite_pragmas)
+    event.listen(read_engine, "connect", _set_sqlite_query_only)
+
+SessionFactory = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+ReadSessionFactory = sessionmaker(bind=read_engine, class_=Session, expire_on_commit=False)
+
+# Accounts are imported out-of-process (app/tools/account_exporter.py), so they expire on a timer
+# instead of being invalidated.
+ACCOUNT_OPTIONS_TTL = 60.0
+_account_options_cache: tuple[float, list[dict[str, Any]]] | None = None
+_account_options_lock = threading.Lock()
+
+# The airline table is rewritten by /api/airlines/refresh in whichever worker served it; the TTL bounds
+# how long the other workers keep serving the old list.
+AIRLINES_TTL = 60.0
+_airline_cache: tuple[float, tuple[dict[str, Any], ...], dict[str, str]] | None = None
+_airline_lock = threading.Lock()
+
+
+@contextmanager
+def get_session(readonly: bool = False) -> Iterator[Session]:
+    factory = ReadSessionFactory if readonly else SessionFactory
+    with factory() as session:
+        yield session
+
+
 def create_run_record(
     run_id: str,
     input_data: dict[str, Any],
@@ -43,28 +135,32 @@ def create_run_record(
     slack_channel: str | None = None,
     slack_thread_ts: str | None = None,
 ) -> None:
+    values = {
+        "status": status,
+        "run_type": run_type,
+        "input_payload": input_data,
+        "output_dir": str(output_dir),
+        "slack_channel": slack_channel,
+        "slack_thread_ts": slack_thread_ts,
+    }
     try:
-        with Session(engine) as session:
-            run = session.get(Run, run_id)
-            if run:
-                run.status = status
-                run.run_type = run_type
-                run.input_payload = input_data
-                run.output_dir = str(output_dir)
-                run.slack_channel = slack_channel
-                run.slack_thread_ts = slack_thread_ts
-            else:
-                run = Run(
-                    id=run_id,
-                    status=status,
-                    run_type=run_type,
-                    input_payload=input_data,
-                    output_dir=str(output_dir),
-                    slack_channel=slack_channel,
-                    slack_thread_ts=slack_thread_ts,
-                    created_at=datetime.utcnow(),
+        with get_session() as session:
+            if IS_SQLITE:
+                # Single INSERT ... ON CONFLICT instead of SELECT followed by INSERT/UPDATE.
+                statement = sqlite_insert(Run).values(id=run_id, **values)
+                statement = statement.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={key: statement.excluded[key] for key in values},
                 )
-                session.add(run)
+                session.execute(statement)
+            else:
+                # Update in place rather than merge() so created_at is never rewritten.
+                run = session.get(Run, run_id)
+                if run is None:
+                    session.add(Run(id=run_id, **values))
+                else:
+                    for key, value in values.items():
+                        setattr(run, key, value)
             session.commit()
     except Exception as exc:
         logger.warning("Failed to persist run %s: %s", run_id, exc)
@@ -72,7 +168,7 @@ def create_run_record(
 
 def update_run_record(run_id: str, status: str, error: str | None, completed_at: datetime | None) -> None:
     try:
-        with Session(engine) as session:
+        with get_session() as session:
             run = session.get(Run, run_id)
             if not run:
                 return
@@ -96,7 +192,7 @@ def save_standby_response(
     error: str | None = None,
 ) -> None:
     try:
-        with Session(engine) as session:
+        with get_session() as session:
             response = StandbyBotResponse(
                 run_id=run_id,
                 status=status,
@@ -107,7 +203,6 @@ def save_standby_response(
                 standby_bots_payload=standby_bots_payload,
                 output_paths=output_paths,
                 error=error,
-                created_at=datetime.utcnow(),
             )
             session.add(response)
             session.commit()
@@ -125,7 +220,7 @@ def save_lookup_response(
     error: str | None = None,
 ) -> None:
     try:
-        with Session(engine) as session:
+        with get_session() as session:
             response = LookupBotResponse(
                 run_id=run_id,
                 status=status,
@@ -134,7 +229,6 @@ def save_lookup_response(
                 lookup_payload=lookup_payload,
                 output_paths=output_paths,
                 error=error,
-                created_at=datetime.utcnow(),
             )
             session.add(response)
             session.commit()
@@ -144,8 +238,8 @@ def save_lookup_response(
 
 def get_lookup_response(run_id: str) -> LookupBotResponse | None:
     try:
-        with Session(engine) as session:
-            statement = select(LookupBotResponse).where(LookupBotResponse.run_id == run_id)
+        with get_session(readonly=True) as session:
+            statement = select(LookupBotResponse).where(LookupBotResponse.run_id == run_id).limit(1)
             return session.exec(statement).first()
     except Exception as exc:
         logger.warning("Failed to fetch lookup response for %s: %s", run_id, exc)
@@ -154,7 +248,7 @@ def get_lookup_response(run_id: str) -> LookupBotResponse | None:
 
 def get_run_input(run_id: str) -> dict[str, Any] | None:
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             run = session.get(Run, run_id)
             return run.input_payload if run else None
     except Exception as exc:
@@ -162,8 +256,12 @@ def get_run_input(run_id: str) -> dict[str, Any] | None:
         return None
 
 def get_account_options() -> list[dict[str, Any]]:
+    global _account_options_cache
+    with _account_options_lock:
+        if _account_options_cache and time.monotonic() - _account_options_cache[0] < ACCOUNT_OPTIONS_TTL:
+            return [dict(item) for item in _account_options_cache[1]]
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             statement = (
                 select(
                     MyidtravelAccount.id,
@@ -175,28 +273,32 @@ def get_account_options() -> list[dict[str, Any]]:
                     onclause=(col(StafftravelerAccount.employee_name) == col(MyidtravelAccount.employee_name)),
                 )
                 .order_by(MyidtravelAccount.employee_name)
+                .execution_options(yield_per=500)
             )
-            rows = session.exec(statement).all()
-        return [
-            {
-                "id": row[0],
-                "employee_name": row[1],
-                "travellers": row[2] or [],
-            }
-            for row in rows
-        ]
+            options = [
+                {
+                    "id": row[0],
+                    "employee_name": row[1],
+                    "travellers": row[2] or [],
+                }
+                for row in session.exec(statement)
+            ]
     except Exception as exc:
         logger.warning("Failed to fetch account options: %s", exc)
         return []
+    with _account_options_lock:
+        _account_options_cache = (time.monotonic(), options)
+    return [dict(item) for item in options]
 
 
 def get_latest_standby_response(run_id: str) -> StandbyBotResponse | None:
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             statement = (
                 select(StandbyBotResponse)
                 .where(StandbyBotResponse.run_id == run_id)
-                .order_by(desc(StandbyBotResponse.created_at))
+                .order_by(desc(StandbyBotResponse.created_at), desc(StandbyBotResponse.id))
+                .limit(1)
             )
             return session.exec(statement).first()
     except Exception as exc:
@@ -204,37 +306,94 @@ def get_latest_standby_response(run_id: str) -> StandbyBotResponse | None:
         return None
 
 
+def get_run_status(run_id: str) -> dict[str, Any] | None:
+    """
+    Status and output paths of the latest standby (or lookup) response, without loading the JSON payloads.
+    """
+    try:
+        with get_session(readonly=True) as session:
+            for model in (StandbyBotResponse, LookupBotResponse):
+                statement = (
+                    select(model.status, model.output_paths)
+                    .where(model.run_id == run_id)
+                    .order_by(desc(model.created_at), desc(model.id))
+                    .limit(1)
+                )
+                row = session.exec(statement).first()
+                if row:
+                    return {"status": row[0], "output_paths": row[1] or {}}
+        return None
+    except Exception as exc:
+        logger.warning("Failed to fetch run status for %s: %s", run_id, exc)
+        return None
+
+
 def save_airlines(airlines: list[dict[str, Any]]) -> None:
+    rows: list[dict[str, Any]] = []
+    for item in airlines:
+        code = str(item.get("value") or item.get("code") or "").strip()
+        if not code:
+            continue
+        rows.append(
+            {
+                "code": code,
+                "label": str(item.get("label") or code).strip(),
+                "disabled": bool(item.get("disabled", False)),
+            }
+        )
+    if not rows:
+        logger.warning("No airlines to save; keeping the existing table")
+        return
     try:
-        with Session(engine) as session:
+        with get_session() as session:
+            # Compare against the table itself, not the cache, which may be stale in this worker.
+            current = sorted(tuple(row) for row in session.exec(select(Airline.code, Airline.label, Airline.disabled)))
+            if current == sorted((row["code"], row["label"], row["disabled"]) for row in rows):
+                # The dropdown rarely changes; skip rewriting the table (and the WAL) when nothing did.
+                _clear_airline_caches()
+                return
             session.exec(sa_delete(Airline))  # type: ignore[arg-type]
-            for item in airlines:
-                code = str(item.get("value") or item.get("code") or "").strip()
-                label = str(item.get("label") or code).strip()
-                if not code:
-                    continue
-                session.add(
-                    Airline(
-                        code=code,
-                        label=label,
-                        disabled=bool(item.get("disabled", False)),
-                        created_at=datetime.utcnow(),
-                    )
-                )
+            # One executemany through Core instead of an ORM INSERT per airline.
+            session.execute(sa_insert(Airline), rows)
             session.commit()
+        _clear_airline_caches()
     except Exception as exc:
         logger.warning("Failed to save airlines: %s", exc)
 
 
+def _airline_snapshot() -> tuple[tuple[dict[str, Any], ...], dict[str, str]]:
+    global _airline_cache
+    with _airline_lock:
+        if _airline_cache and time.monotonic() - _airline_cache[0] < AIRLINES_TTL:
+            return _airline_cache[1], _airline_cache[2]
+    with get_session(readonly=True) as session:
+        statement = select(Airline.code, Airline.label, Airline.disabled).order_by(Airline.label)
+        rows = tuple({"value": row[0], "label": row[1], "disabled": row[2]} for row in session.exec(statement))
+    labels: dict[str, str] = {}
+    for row in rows:
+        labels.setdefault(row["value"], row["label"])
+    with _airline_lock:
+        _airline_cache = (time.monotonic(), rows, labels)
+    return rows, labels
+
+
+def _airline_rows() -> tuple[dict[str, Any], ...]:
+    return _airline_snapshot()[0]
+
+
+def _airline_label_map() -> dict[str, str]:
+    return _airline_snapshot()[1]
+
+
+def _clear_airline_caches() -> None:
+    global _airline_cache
+    with _airline_lock:
+        _airline_cache = None
+
+
 def list_airlines() -> list[dict[str, Any]]:
     try:
-        with Session(engine) as session:
-            statement = select(Airline).order_by(Airline.label)
-            rows = session.exec(statement).all()
-        return [
-            {"value": row.code, "label": row.label, "disabled": row.disabled}
-            for row in rows
-        ]
+        return [dict(row) for row in _airline_rows()]
     except Exception as exc:
         logger.warning("Failed to list airlines: %s", exc)
         return []
@@ -244,10 +403,7 @@ def get_airline_label(code: str) -> str | None:
     if not code:
         return None
     try:
-        with Session(engine) as session:
-            statement = select(Airline.label).where(Airline.code == code)
-            row = session.exec(statement).first()
-        return row[0] if row else None
+        return _airline_label_map().get(code)
     except Exception as exc:
         logger.warning("Failed to fetch airline label for %s: %s", code, exc)
         return None
@@ -255,7 +411,7 @@ def get_airline_label(code: str) -> str | None:
 
 def list_stafftraveler_accounts() -> list[dict[str, Any]]:
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             statement = select(StafftravelerAccount.id, StafftravelerAccount.employee_name).order_by(
                 StafftravelerAccount.employee_name
             )
@@ -268,7 +424,7 @@ def list_stafftraveler_accounts() -> list[dict[str, Any]]:
 
 def get_stafftraveler_account_by_id(account_id: int) -> StafftravelerAccount | None:
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             return session.get(StafftravelerAccount, account_id)
     except Exception as exc:
         logger.warning("Failed to fetch stafftraveler account %s: %s", account_id, exc)
@@ -277,7 +433,7 @@ def get_stafftraveler_account_by_id(account_id: int) -> StafftravelerAccount | N
 
 def get_myidtravel_account(account_id: int) -> MyidtravelAccount | None:
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             return session.get(MyidtravelAccount, account_id)
     except Exception as exc:
         logger.warning("Failed to fetch myidtravel account %s: %s", account_id, exc)
@@ -286,7 +442,7 @@ def get_myidtravel_account(account_id: int) -> MyidtravelAccount | None:
 
 def get_stafftraveler_account_by_employee_name(employee_name: str) -> StafftravelerAccount | None:
     try:
-        with Session(engine) as session:
+        with get_session(readonly=True) as session:
             statement = select(StafftravelerAccount).where(StafftravelerAccount.employee_name == employee_name)
             return session.exec(statement).first()
     except Exception as exc:
@@ -9,6 +9,7 @@ from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
 from app import config
+from app.bots import browser_pool
 from app.db import ensure_data_dir
 from app.routes import accounts, airlines, auth, lookup, runs, ws
 from app.routes import slack as slack_routes
@@ -49,6 +50,7 @@ async def startup_event() -> None:
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
     await stop_slack_bot()
+    await browser_pool.shutdown()
     logger.info("FastAPI application stopped")
 
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, DateTime, Index, func
 from sqlmodel import Field, SQLModel
 
 
@@ -17,12 +17,15 @@ class Run(SQLModel, table=True):
     output_dir: str | None = Field(default=None)
     slack_channel: str | None = Field(default=None)
     slack_thread_ts: str | None = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, server_default=func.now()),
+    )
     completed_at: datetime | None = Field(default=None)
 
 
 class StandbyBotResponse(SQLModel, table=True):
     __tablename__: str = "standby_bot_responses"
+    __table_args__ = (Index("ix_standby_bot_responses_run_id_created_at", "run_id", "created_at"),)
     id: int | None = Field(default=None, primary_key=True)
     run_id: str = Field(foreign_key="runs.id", index=True, nullable=False)
     status: str = Field(nullable=False)
@@ -33,11 +36,14 @@ class StandbyBotResponse(SQLModel, table=True):
     standby_bots_payload: list[Any] | dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
     output_paths: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
     error: str | None = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, server_default=func.now()),
+    )
 
 
 class LookupBotResponse(SQLModel, table=True):
     __tablename__: str = "lookup_bot_responses"
+    __table_args__ = (Index("ix_lookup_bot_responses_run_id_created_at", "run_id", "created_at"),)
     id: int | None = Field(default=None, primary_key=True)
     run_id: str = Field(foreign_key="runs.id", index=True, nullable=False)
     status: str = Field(nullable=False)
@@ -46,7 +52,9 @@ class LookupBotResponse(SQLModel, table=True):
     lookup_payload: Any | None = Field(default=None, sa_column=Column(JSON))
     output_paths: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
     error: str | None = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, server_default=func.now()),
+    )
 
 
 class Airline(SQLModel, table=True):
@@ -55,27 +63,33 @@ class Airline(SQLModel, table=True):
     code: str = Field(nullable=False, index=True)
     label: str = Field(nullable=False)
     disabled: bool = Field(default=False, nullable=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, server_default=func.now()),
+    )
 
 
 class MyidtravelAccount(SQLModel, table=True):
     __tablename__: str = "myidtravel_accounts"
     id: int | None = Field(default=None, primary_key=True)
-    employee_name: str = Field(nullable=False)
+    employee_name: str = Field(nullable=False, index=True)
     username: str = Field(nullable=False, index=True)
     password: str = Field(nullable=False)
     gender: str | None = Field(default=None)
     airport: str | None = Field(default=None)
     position: str | None = Field(default=None)
     travellers: list[dict[str, Any]] | None = Field(default=None, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, server_default=func.now()),
+    )
 
 
 class StafftravelerAccount(SQLModel, table=True):
     __tablename__: str = "stafftraveler_accounts"
     id: int | None = Field(default=None, primary_key=True)
-    employee_name: str = Field(nullable=False)
+    employee_name: str = Field(nullable=False, index=True)
     username: str = Field(nullable=False, index=True)
     email: str | None = Field(default=None)
     password: str = Field(nullable=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, server_default=func.now()),
+    )
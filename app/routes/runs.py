@@ -1,12 +1,15 @@
 import asyncio
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
 from io import BytesIO
 from typing import Annotated, Any
 
-import pandas as pd
+import xlsxwriter
 from fastapi import APIRouter, Body, HTTPException
 from fastapi.responses import StreamingResponse
 
-from app.db import create_run_record, get_latest_standby_response, get_lookup_response
+from app.db import create_run_record, get_latest_standby_response, get_lookup_response, get_run_status
 from app.runners.standard import execute_run
 from app.state import OUTPUT_ROOT, RUNS
 from app.utils import make_run_id
@@ -14,6 +17,10 @@ from app.ws import RunState
 
 router = APIRouter(prefix="/api")
 
+EXCEL_CACHE_SIZE = 16
+_excel_cache: OrderedDict[str, tuple[tuple[str, int | None], bytes]] = OrderedDict()
+_excel_cache_lock = threading.Lock()
+
 
 def _format_segments(flight: dict[str, Any]) -> str:
     segments = flight.get("segments") or []
@@ -62,17 +69,60 @@ def _format_segment_staff_loads(flight: dict[str, Any]) -> str:
     return " | ".join(part for part in parts if part)
 
 
-def _excel_response(filename: str, sheets: dict[str, list[dict[str, Any]]]) -> StreamingResponse:
+def _excel_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+def _build_excel(sheets: dict[str, list[dict[str, Any]]]) -> bytes:
+    """
+    Write the report straight through xlsxwriter, row by row, so constant_memory can stream it.
+    """
     output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        for name, rows in sheets.items():
-            safe_name = name[:31] or "Sheet1"
-            df = pd.DataFrame(rows or [])
-            df.to_excel(writer, sheet_name=safe_name, index=False)
-    output.seek(0)
+    workbook = xlsxwriter.Workbook(
+        output,
+        {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False},
+    )
+    header_format = workbook.add_format({"bold": True})
+    for name, rows in sheets.items():
+        worksheet = workbook.add_worksheet(name[:31] or "Sheet1")
+        # Every key across the rows, in order of first appearance.
+        columns = list(dict.fromkeys(key for row in rows or [] for key in row))
+        if not columns:
+            continue
+        worksheet.write_row(0, 0, columns, header_format)
+        for row_idx, row in enumerate(rows, start=1):
+            worksheet.write_row(row_idx, 0, [_excel_cell(row.get(column)) for column in columns])
+    workbook.close()
+    return output.getvalue()
+
+
+def _cached_excel(
+    run_id: str,
+    version: tuple[str, int | None],
+    build_sheets: Callable[[], dict[str, list[dict[str, Any]]]],
+) -> bytes:
+    """
+    Reuse the workbook from the last download of this run unless the stored response changed.
+    """
+    with _excel_cache_lock:
+        cached = _excel_cache.get(run_id)
+        if cached and cached[0] == version:
+            _excel_cache.move_to_end(run_id)
+            return cached[1]
+    payload = _build_excel(build_sheets())
+    with _excel_cache_lock:
+        _excel_cache[run_id] = (version, payload)
+        if len(_excel_cache) > EXCEL_CACHE_SIZE:
+            _excel_cache.popitem(last=False)
+    return payload
+
+
+def _excel_response(filename: str, payload: bytes) -> StreamingResponse:
     headers = {"Content-Disposition": f"attachment; filename={filename}"}
     return StreamingResponse(
-        output,
+        BytesIO(payload),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers=headers,
     )
@@ -189,17 +239,8 @@ async def start_run(payload: Annotated[dict[str, Any], Body(...)]):
 
 @router.get("/runs/{run_id}")
 async def run_status(run_id: str):
-    standby = get_latest_standby_response(run_id)
-    lookup = get_lookup_response(run_id)
-    files: dict[str, Any] = {}
-    status = "unknown"
-    if standby:
-        status = standby.status
-        files = standby.output_paths or {}
-    elif lookup:
-        status = lookup.status
-        files = lookup.output_paths or {}
-    return {"run_id": run_id, "status": status, "files": files}
+    summary = get_run_status(run_id) or {}
+    return {"run_id": run_id, "status": summary.get("status", "unknown"), "files": summary.get("output_paths", {})}
 
 
 @router.get("/runs/{run_id}/download/{kind}")
@@ -207,25 +248,38 @@ async def download_run(run_id: str, kind: str):
     if kind != "excel":
         raise HTTPException(status_code=404, detail="Unknown download kind")
 
-    lookup = get_lookup_response(run_id)
+    # The two lookups are independent; run them side by side off the event loop.
+    lookup, standby = await asyncio.gather(
+        asyncio.to_thread(get_lookup_response, run_id),
+        asyncio.to_thread(get_latest_standby_response, run_id),
+    )
     if lookup and lookup.lookup_payload:
-        rows = _flatten_lookup_payload(lookup.lookup_payload)
-        if not rows:
-            raise HTTPException(status_code=404, detail="Lookup data is empty")
-        return _excel_response(f"{run_id}.xlsx", {"Seat Availability": rows})
+        lookup_payload = lookup.lookup_payload
+
+        def build_lookup_sheets() -> dict[str, list[dict[str, Any]]]:
+            rows = _flatten_lookup_payload(lookup_payload)
+            if not rows:
+                raise HTTPException(status_code=404, detail="Lookup data is empty")
+            return {"Seat Availability": rows}
+
+        payload = await asyncio.to_thread(_cached_excel, run_id, ("lookup", lookup.id), build_lookup_sheets)
+        return _excel_response(f"{run_id}.xlsx", payload)
 
-    standby = get_latest_standby_response(run_id)
     if not standby:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    sheets: dict[str, list[dict[str, Any]]] = {}
-    if standby.standby_bots_payload:
-        sheets["Flights"] = _flatten_standby_payload(standby.standby_bots_payload)
-    if standby.gemini_payload and isinstance(standby.gemini_payload, list):
-        sheets["Top 5"] = standby.gemini_payload
-    if not sheets:
-        raise HTTPException(status_code=404, detail="No report data available")
-    return _excel_response(f"{run_id}.xlsx", sheets)
+    def build_standby_sheets() -> dict[str, list[dict[str, Any]]]:
+        sheets: dict[str, list[dict[str, Any]]] = {}
+        if standby.standby_bots_payload:
+            sheets["Flights"] = _flatten_standby_payload(standby.standby_bots_payload)
+        if standby.gemini_payload and isinstance(standby.gemini_payload, list):
+            sheets["Top 5"] = standby.gemini_payload
+        if not sheets:
+            raise HTTPException(status_code=404, detail="No report data available")
+        return sheets
+
+    payload = await asyncio.to_thread(_cached_excel, run_id, ("standby", standby.id), build_standby_sheets)
+    return _excel_response(f"{run_id}.xlsx", payload)
 
 
 @router.get("/runs/{run_id}/download-report-xlsx")
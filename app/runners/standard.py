@@ -1,6 +1,5 @@
 import asyncio
 import copy
-import json
 import logging
 import re
 import urllib.error
@@ -8,6 +7,8 @@ import urllib.request
 from datetime import datetime
 from typing import Any
 
+import orjson
+
 from app import config
 from app.bots import google_flights_bot, myidtravel_bot, stafftraveler_bot
 from app.db import (
@@ -186,13 +187,13 @@ def _call_gemini(prompt: str) -> str:
     }
     req = urllib.request.Request(
         url,
-        data=json.dumps(payload).encode("utf-8"),
+        data=orjson.dumps(payload),
         headers={"Content-Type": "application/json"},
         method="POST",
     )
     try:
         with urllib.request.urlopen(req, timeout=60) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
+            data = orjson.loads(resp.read())
     except urllib.error.HTTPError as exc:
         detail = exc.read().decode("utf-8") if exc.fp else str(exc)
         raise RuntimeError(f"Gemini HTTP error {exc.code}: {detail}") from exc
@@ -227,11 +228,11 @@ async def _generate_flight_loads_gemini(
         "and source_file.\n"
         "4. Tone: Be concise and direct. Do not include introductory fluff.\n\n"
         "myIDTravel JSON:\n"
-        f"{json.dumps(myid_data)}\n\n"
+        f"{orjson.dumps(myid_data).decode()}\n\n"
         "StaffTraveller JSON:\n"
-        f"{json.dumps(staff_data)}\n\n"
+        f"{orjson.dumps(staff_data).decode()}\n\n"
         "Google Flights JSON:\n"
-        f"{json.dumps(google_data)}\n"
+        f"{orjson.dumps(google_data).decode()}\n"
     )
     logger.info("Gemini: sending request (prompt chars=%s)", len(prompt))
     text = await asyncio.to_thread(_call_gemini, prompt)
@@ -261,7 +262,7 @@ async def _generate_top5_from_standby_payload(
         "date, load_summary, and source_notes.\n"
         "3. Be concise and return only JSON.\n\n"
         "Standby Bot Payload JSON:\n"
-        f"{json.dumps(standby_payload)}\n"
+        f"{orjson.dumps(standby_payload).decode()}\n"
     )
     logger.info("Gemini: sending request (prompt chars=%s)", len(prompt))
     text = await asyncio.to_thread(_call_gemini, prompt)
@@ -516,7 +517,25 @@ async def execute_run(state: RunState, limit: int, headed: bool) -> None:
         await state.log("Run started; launching MyIDTravel.")
         logger.info("Run %s started (headed=%s, limit=%s)", state.id, headed, limit)
 
-        myid_result = await run_myidtravel(state, headed)
+        # The StaffTraveler login does not depend on MyIDTravel results, so overlap it with the search.
+        staff_warmup = None
+        if state.stafftraveler_credentials:
+            staff_warmup = asyncio.create_task(
+                stafftraveler_bot.warm_session(
+                    headless=not headed,
+                    username=state.stafftraveler_credentials["username"],
+                    password=state.stafftraveler_credentials["password"],
+                )
+            )
+
+        myid_ok = False
+        try:
+            myid_result = await run_myidtravel(state, headed)
+            myid_ok = myid_result.get("status") != "error"
+        finally:
+            # A failed search never reaches StaffTraveler; don't hold a browser context for it.
+            if staff_warmup and not myid_ok:
+                staff_warmup.cancel()
         myid_payload = myid_result.get("payload") if isinstance(myid_result, dict) else None
         if myid_result.get("status") == "error":
             state.status = "error"
@@ -550,6 +569,8 @@ async def execute_run(state: RunState, limit: int, headed: bool) -> None:
             if isinstance(flight, dict)
         ]
         if not selectable_flights:
+            if staff_warmup:
+                staff_warmup.cancel()
             message = "MyIDTravel: no selectable flights found for this search."
             await notify_thread_message(state, message)
             await state.log(message)
@@ -623,6 +644,9 @@ async def execute_run(state: RunState, limit: int, headed: bool) -> None:
 
             if not state.stafftraveler_credentials:
                 raise ValueError("Stafftraveler credentials are required but were not found in state.")
+            # Wait for the warmed session here, not before scheduling, so Google Flights never waits on it.
+            if staff_warmup:
+                await staff_warmup
 
             return await stafftraveler_bot.update_selectable_flights(
                 headless=not headed,
@@ -637,6 +661,8 @@ async def execute_run(state: RunState, limit: int, headed: bool) -> None:
         stafftraveler_payload = None
         if state.input_data.get("auto_request_stafftraveler") and state.stafftraveler_credentials:
             await state.log("[stafftraveler] auto-request search starting")
+            if staff_warmup:
+                await staff_warmup
 
             def _variants(value: str) -> set[str]:
                 normalized = re.sub(r"\s+", "", value or "").upper()
@@ -1,16 +1,18 @@
 import asyncio
-import json
 from pathlib import Path
 from typing import Any
 
-from playwright.async_api import Page, async_playwright
+import orjson
+from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeout
 
 from app import config
-from app.bots import myidtravel_bot
+from app.bots import browser_pool, myidtravel_bot
 
 AIRLINE_OUTPUT = Path("airlines.json")
 ORIGIN_LOOKUP_OUTPUT = Path("origin_lookup_sample.json")
 AIRPORT_PICKER_OUTPUT = Path("airport_picker.json")
+ORIGIN_LOOKUP_KEYWORDS = ("airport", "origin", "destination", "lookup", "suggest")
 
 
 async def _page_has_form(page: Page) -> bool:
@@ -45,7 +47,13 @@ async def goto_home(page: Page, url_override: str | None = None, extra_wait_ms:
         tried.append(url)
         try:
             await page.goto(url, wait_until="domcontentloaded", timeout=25000)
-            await page.wait_for_timeout(2000 + extra_wait_ms)
+            # Return as soon as the form (or the eligibility notice) renders instead of sleeping 2s + 3s.
+            try:
+                await page.wait_for_selector(
+                    config.HOME_READY_SELECTOR, state="visible", timeout=5000 + 2 * extra_wait_ms
+                )
+            except PlaywrightTimeout:
+                pass
             current_url = page.url
             if "signon" in current_url:
                 raise RuntimeError("Redirected to signon.ual.com; auth_state.json may be expired.")
@@ -54,12 +62,6 @@ async def goto_home(page: Page, url_override: str | None = None, extra_wait_ms:
                 raise RuntimeError(blocking)
             if await _page_has_form(page):
                 return current_url
-            await page.wait_for_timeout(3000 + extra_wait_ms)
-            blocking = await _blocking_message()
-            if blocking:
-                raise RuntimeError(blocking)
-            if await _page_has_form(page):
-                return current_url
         except Exception as exc:
             last_error = exc
     raise RuntimeError(f"Failed to load myIDTravel home page from {tried}. Last error: {last_error}")
@@ -134,17 +136,19 @@ async def extract_airline_options(page: Page) -> list[dict[str, Any]]:
     raise RuntimeError("Airline dropdown not found. Is the page layout different?")
 
 
+def _is_lookup_response(response) -> bool:
+    if response.request.resource_type not in {"xhr", "fetch"}:
+        return False
+    url_lower = response.url.lower()
+    return any(k in url_lower for k in ORIGIN_LOOKUP_KEYWORDS)
+
+
 async def capture_origin_lookup(page: Page, query: str) -> list[dict[str, Any]]:
     captured: list[dict[str, Any]] = []
-    keywords = ("airport", "origin", "destination", "lookup", "suggest")
+    pending: list[asyncio.Task] = []
 
     async def handle_response(response) -> None:
         try:
-            if response.request.resource_type not in {"xhr", "fetch"}:
-                return
-            url_lower = response.url.lower()
-            if not any(k in url_lower for k in keywords):
-                return
             try:
                 body = await response.json()
             except Exception:
@@ -160,16 +164,32 @@ async def capture_origin_lookup(page: Page, query: str) -> list[dict[str, Any]]:
         except Exception:
             return
 
-    page.on("response", lambda resp: asyncio.create_task(handle_response(resp)))
+    def on_response(response) -> None:
+        # Filter in the callback so unrelated responses never spawn a task.
+        if _is_lookup_response(response):
+            pending.append(asyncio.create_task(handle_response(response)))
 
-    origin_input = page.locator('input[placeholder*="Origin" i]').first
-    await origin_input.click()
-    await origin_input.fill("")
-    await origin_input.type(query, delay=60)
-    await page.wait_for_timeout(2500)
+    def is_final_lookup(response) -> bool:
+        return _is_lookup_response(response) and query.lower() in response.url.lower()
+
+    page.on("response", on_response)
+    try:
+        origin_input = page.locator('input[placeholder*="Origin" i]').first
+        await origin_input.click()
+        await origin_input.fill("")
+        # Wait for the lookup of the full query instead of a fixed 2.5s settle.
+        try:
+            async with page.expect_response(is_final_lookup, timeout=2500 + 60 * len(query)):
+                await origin_input.type(query, delay=60)
+        except PlaywrightTimeout:
+            pass
+    finally:
+        page.remove_listener("response", on_response)
+    if pending:
+        await asyncio.gather(*pending)
 
     if captured:
-        ORIGIN_LOOKUP_OUTPUT.write_text(json.dumps(captured, indent=2))
+        ORIGIN_LOOKUP_OUTPUT.write_bytes(orjson.dumps(captured, option=orjson.OPT_INDENT_2))
     return captured
 
 
@@ -210,7 +230,7 @@ async def fetch_airport_picker(
     if not resp.ok:
         raise RuntimeError(f"airportPicker request failed {resp.status}: {await resp.text()}")
     data = await resp.json()
-    AIRPORT_PICKER_OUTPUT.write_text(json.dumps(data, indent=2))
+    AIRPORT_PICKER_OUTPUT.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     return data
 
 
@@ -224,13 +244,12 @@ async def scrape_airlines_task(
 ) -> dict[str, Any]:
     storage_file = Path("auth_state.json")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=headless)
+    # Reuse the shared Chromium; only the context (and its auth state) is per call.
+    context = await browser_pool.get_context("airlines", headless=headless, storage_state=storage_file)
+    try:
         if storage_file.exists():
-            context = await browser.new_context(storage_state=str(storage_file))
             page = await context.new_page()
         else:
-            context = await browser.new_context()
             try:
                 page = await myidtravel_bot.perform_login(
                     context=context,
@@ -246,7 +265,7 @@ async def scrape_airlines_task(
         home_url = await goto_home(page, url_override=url_override, extra_wait_ms=extra_wait_ms)
 
         airlines = await extract_airline_options(page)
-        AIRLINE_OUTPUT.write_text(json.dumps(airlines, indent=2))
+        AIRLINE_OUTPUT.write_bytes(orjson.dumps(airlines, option=orjson.OPT_INDENT_2))
 
         airport_picker_payload = None
         if airport_term:
@@ -261,9 +280,8 @@ async def scrape_airlines_task(
         origin_lookup_payload = None
         if sample_origin_query:
             origin_lookup_payload = await capture_origin_lookup(page, sample_origin_query)
-
-        await context.close()
-        await browser.close()
+    finally:
+        await browser_pool.release(context)
 
     return {
         "home_url": home_url,
@@ -1,23 +1,93 @@
 from __future__ import annotations
 
 import argparse
-import json
+import functools
 import os
 import re
 import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
+import orjson
 from dotenv import load_dotenv
-from sqlalchemy import delete
-from sqlmodel import Session, create_engine
+from python_calamine import CalamineWorkbook
+from sqlalchemy import delete, event, insert
+from sqlalchemy.engine import Connection
+from sqlmodel import create_engine
 
-BASE_DIR = Path(__file__).resolve().parents[1]
+BASE_DIR = Path(__file__).resolve().parents[2]
 if str(BASE_DIR) not in sys.path:
     sys.path.append(str(BASE_DIR))
 
-from models import MyidtravelAccount, StafftravelerAccount
+from app.models import MyidtravelAccount, StafftravelerAccount
+
+IMPORT_BATCH_SIZE = 5000
+NDJSON_SUFFIXES = {".jsonl", ".ndjson"}
+# Same journal settings as the app's engine, so the import does one fsync per transaction.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
+# Below this many rows, process start-up costs more than the conversion itself.
+PARALLEL_EXPORT_MIN_ROWS = 5000
+_BRACKET_NOTE_RE = re.compile(r"\[[^\]]*]")
+# Parenthesised notes, including a trailing unclosed "(...".
+_PAREN_NOTE_RE = re.compile(r"\([^)]*\)?")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# Source column (0-based) of each exported field; everything else in the sheet is never converted.
+FLIGHT_MASTER_FIELDS = {"employee": 0, "username": 2, "password": 3, "gender": 6, "airport": 7, "position": 8}
+FLIGHT_MASTER_TRAVELLERS = (
+    (21, 22, "Parent 1"),
+    (25, 26, "Parent 2"),
+    (33, 34, "Primary Friend"),
+    (36, 37, "2nd Enrolled Friend"),
+    (42, 43, "Extended Family Buddy"),
+    (45, 46, "Children"),
+)
+FLIGHT_MASTER_USECOLS = (
+    *FLIGHT_MASTER_FIELDS.values(),
+    *(col for names_col, dobs_col, _ in FLIGHT_MASTER_TRAVELLERS for col in (names_col, dobs_col)),
+)
+STAFF_TRAVELER_FIELDS = {"employee_name": 0, "username": 1, "email": 2, "password": 3}
+
+
+def _iter_sheet_rows(input_file: str, min_row: int, usecols: tuple[int, ...]) -> Iterator[dict[int, Any]]:
+    """
+    Yield {column: value} for the usecols of the first sheet, from min_row on (1-based, like Excel).
+    Rows that are blank across usecols are skipped.
+    """
+    sheet = CalamineWorkbook.from_path(input_file).get_sheet_by_index(0)
+    # Keep leading empty rows/columns so positions line up with the sheet's own A1 grid.
+    for row in sheet.to_python(skip_empty_area=False)[min_row - 1 :]:
+        width = len(row)
+        values = {idx: _cell_value(row[idx]) if idx < width else None for idx in usecols}
+        if any(value is not None for value in values.values()):
+            yield values
+
+
+def _cell_value(value: Any) -> Any:
+    if value == "":
+        return None
+    # Date cells come back as date; keep pandas' midnight timestamps so DOBs still export as "YYYY-MM-DD 00:00:00".
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.min)
+    # Excel stores every number as a float; keep whole numbers (account ids, usernames) integral.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    # calamine already hands back str for text cells; only numbers/dates need converting.
+    return value.strip() if isinstance(value, str) else str(value)
 
 
 class AccountExporter:
@@ -26,17 +96,19 @@ class AccountExporter:
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
 
     def clean_and_split(self, value: Any) -> list[str]:
-        if pd.isna(value) or str(value).strip().lower() == "nan" or str(value).strip() == "":
+        if value is None:
             return []
-        return [item.strip() for item in str(value).split("\n") if item.strip()]
+        text = str(value).strip()
+        if not text or text.lower() == "nan":
+            return []
+        return [item for item in (part.strip() for part in text.split("\n")) if item]
 
     def clean_traveller_name(self, name: str | None) -> str | None:
         if not name:
             return name
-        cleaned = re.sub(r"\[[^\]]*]", "", name)
-        cleaned = re.sub(r"\([^)]*\)", "", cleaned)
-        cleaned = re.sub(r"\([^)]*$", "", cleaned)
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
+        cleaned = _BRACKET_NOTE_RE.sub("", name)
+        cleaned = _PAREN_NOTE_RE.sub("", cleaned)
+        cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip()
         return cleaned or None
 
     def map_travellers(self, names_str: Any, dobs_str: Any, relationship_type: str) -> list[dict[str, Any]]:
@@ -56,74 +128,107 @@ class AccountExporter:
                 )
         return result
 
+    def flight_master_record(self, row: dict[int, Any]) -> dict[str, Any]:
+        travellers: list[dict[str, Any]] = []
+        for names_col, dobs_col, relationship in FLIGHT_MASTER_TRAVELLERS:
+            travellers.extend(self.map_travellers(row[names_col], row[dobs_col], relationship))
+
+        record: dict[str, Any] = {field: _cell_text(row[col]) for field, col in FLIGHT_MASTER_FIELDS.items()}
+        record["travellers"] = travellers
+        return record
+
     def export_flight_master(self, input_file: str) -> Path:
-        df = pd.read_excel(input_file, skiprows=1)
-        records: list[dict[str, Any]] = []
-        for _, row in df.iterrows():
-            travellers: list[dict[str, Any]] = []
-            travellers.extend(self.map_travellers(row.iloc[21], row.iloc[22], "Parent 1"))
-            travellers.extend(self.map_travellers(row.iloc[25], row.iloc[26], "Parent 2"))
-            travellers.extend(self.map_travellers(row.iloc[33], row.iloc[34], "Primary Friend"))
-            travellers.extend(self.map_travellers(row.iloc[36], row.iloc[37], "2nd Enrolled Friend"))
-            travellers.extend(self.map_travellers(row.iloc[42], row.iloc[43], "Extended Family Buddy"))
-            travellers.extend(self.map_travellers(row.iloc[45], row.iloc[46], "Children"))
-
-            records.append(
-                {
-                    "employee": str(row.iloc[0]).strip(),
-                    "username": str(row.iloc[2]).strip(),
-                    "password": str(row.iloc[3]).strip(),
-                    "gender": str(row.iloc[6]).strip(),
-                    "airport": str(row.iloc[7]).strip(),
-                    "position": str(row.iloc[8]).strip(),
-                    "travellers": travellers,
-                }
-            )
-
-        return self._save(records, "flight-master-accounts.json")
+        # Row 1 is a banner and row 2 the header; accounts start on row 3.
+        rows = list(_iter_sheet_rows(input_file, min_row=3, usecols=FLIGHT_MASTER_USECOLS))
+        workers = os.cpu_count() or 1
+        if len(rows) < PARALLEL_EXPORT_MIN_ROWS or workers < 2:
+            records = [self.flight_master_record(row) for row in rows]
+        else:
+            # Name cleaning is pure-Python CPU work; spread it over processes for big sheets.
+            chunksize = max(1, len(rows) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                records = list(pool.map(self.flight_master_record, rows, chunksize=chunksize))
+
+        return self._save(records, "flight-master-accounts.jsonl")
 
     def export_staff_traveler(self, input_file: str) -> Path:
-        df = pd.read_excel(input_file)
+        usecols = tuple(STAFF_TRAVELER_FIELDS.values())
         records: list[dict[str, Any]] = []
-        for _, row in df.iterrows():
-            records.append(
-                {
-                    "employee_name": str(row.iloc[0]).strip(),
-                    "username": str(row.iloc[1]).strip(),
-                    "email": str(row.iloc[2]).strip(),
-                    "password": str(row.iloc[3]).strip(),
-                }
-            )
-
-        return self._save(records, "stafftraveler-accounts.json")
+        for row in _iter_sheet_rows(input_file, min_row=2, usecols=usecols):
+            records.append({field: _cell_text(row[col]) for field, col in STAFF_TRAVELER_FIELDS.items()})
+
+        return self._save(records, "stafftraveler-accounts.jsonl")
 
     def _save(self, data: list[dict[str, Any]], filename: str) -> Path:
         path = Path(self.output_dir) / filename
-        path.write_text(json.dumps(data, indent=2))
+        # One record per line, so the importer can stream it instead of parsing one big array.
+        with path.open("wb") as fh:
+            for record in data:
+                fh.write(orjson.dumps(record))
+                fh.write(b"\n")
         print(f"Exported {len(data)} records to {path}")
         return path
 
 
-def _load_json(path: Path) -> list[dict[str, Any]]:
-    data = json.loads(path.read_text())
+def _load_json(path: Path) -> Iterator[dict[str, Any]]:
+    """
+    Yield account records from an NDJSON export (.jsonl/.ndjson) or a legacy JSON array file.
+    """
+    if path.suffix.lower() in NDJSON_SUFFIXES:
+        with path.open("rb") as fh:
+            for line in fh:
+                if line.strip():
+                    yield orjson.loads(line)
+        return
+    data = orjson.loads(path.read_bytes())
     if not isinstance(data, list):
         raise ValueError(f"Expected a JSON array in {path}")
-    return data
+    yield from data
+
 
+def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
 
+
+@functools.cache
 def _build_engine() -> Any:
     load_dotenv(Path(__file__).resolve().parents[1] / ".env", override=True, interpolate=False)
     database_url = os.getenv("DATABASE_URL", "sqlite:///./data/globalpass.db")
-    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
-    return create_engine(database_url, connect_args=connect_args)
-
-
-def _import_myidtravel(records: list[dict[str, Any]], session: Session, truncate: bool) -> int:
+    is_sqlite = database_url.startswith("sqlite")
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+    engine = create_engine(database_url, connect_args=connect_args, insertmanyvalues_page_size=IMPORT_BATCH_SIZE)
+    if is_sqlite and ":memory:" not in database_url:
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def _insert_rows(conn: Connection, model: Any, rows: Iterable[dict[str, Any]], truncate: bool) -> int:
+    """
+    Insert rows with one Core executemany per batch, holding at most one batch in memory.
+    """
+    table = model.__table__
     if truncate:
-        session.exec(delete(MyidtravelAccount))
-        session.commit()
-
+        conn.execute(delete(table))
     inserted = 0
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+        inserted += len(batch)
+    return inserted
+
+
+def _myidtravel_rows(records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
     for record in records:
         employee_name = record.get("employee_name") or record.get("employee") or ""
         username = record.get("username") or ""
@@ -131,28 +236,18 @@ def _import_myidtravel(records: list[dict[str, Any]], session: Session, truncate
         if not employee_name or not username or not password:
             continue
 
-        account = MyidtravelAccount(
-            employee_name=employee_name,
-            username=username,
-            password=password,
-            gender=record.get("gender"),
-            airport=record.get("airport"),
-            position=record.get("position"),
-            travellers=record.get("travellers") or record.get("travelers"),
-        )
-        session.add(account)
-        inserted += 1
-
-    session.commit()
-    return inserted
+        yield {
+            "employee_name": employee_name,
+            "username": username,
+            "password": password,
+            "gender": record.get("gender"),
+            "airport": record.get("airport"),
+            "position": record.get("position"),
+            "travellers": record.get("travellers") or record.get("travelers"),
+        }
 
 
-def _import_stafftraveler(records: list[dict[str, Any]], session: Session, truncate: bool) -> int:
-    if truncate:
-        session.exec(delete(StafftravelerAccount))
-        session.commit()
-
-    inserted = 0
+def _stafftraveler_rows(records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
     for record in records:
         employee_name = record.get("employee_name") or record.get("employee") or ""
         username = record.get("username") or ""
@@ -160,17 +255,20 @@ def _import_stafftraveler(records: list[dict[str, Any]], session: Session, trunc
         if not employee_name or not username or not password:
             continue
 
-        account = StafftravelerAccount(
-            employee_name=employee_name,
-            username=username,
-            email=record.get("email"),
-            password=password,
-        )
-        session.add(account)
-        inserted += 1
+        yield {
+            "employee_name": employee_name,
+            "username": username,
+            "email": record.get("email"),
+            "password": password,
+        }
 
-    session.commit()
-    return inserted
+
+def _import_myidtravel(records: Iterable[dict[str, Any]], conn: Connection, truncate: bool) -> int:
+    return _insert_rows(conn, MyidtravelAccount, _myidtravel_rows(records), truncate)
+
+
+def _import_stafftraveler(records: Iterable[dict[str, Any]], conn: Connection, truncate: bool) -> int:
+    return _insert_rows(conn, StafftravelerAccount, _stafftraveler_rows(records), truncate)
 
 
 def _run_export(args: argparse.Namespace) -> None:
@@ -183,14 +281,15 @@ def _run_export(args: argparse.Namespace) -> None:
 
 def _run_import(args: argparse.Namespace) -> None:
     engine = _build_engine()
-    with Session(engine) as session:
+    # One Core transaction for both tables: a failure rolls back every truncate and insert.
+    with engine.begin() as conn:
         if args.myidtravel:
             records = _load_json(Path(args.myidtravel))
-            inserted = _import_myidtravel(records, session, args.truncate)
+            inserted = _import_myidtravel(records, conn, args.truncate)
             print(f"Myidtravel: inserted {inserted} row(s).")
         if args.stafftraveler:
             records = _load_json(Path(args.stafftraveler))
-            inserted = _import_stafftraveler(records, session, args.truncate)
+            inserted = _import_stafftraveler(records, conn, args.truncate)
             print(f"Stafftraveler: inserted {inserted} row(s).")
 
 
@@ -198,14 +297,14 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Export or import account data.")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    export_parser = subparsers.add_parser("export", help="Export accounts to JSON.")
+    export_parser = subparsers.add_parser("export", help="Export accounts to NDJSON.")
     export_parser.add_argument("--type", choices=["flight-master", "stafftraveler"], required=True)
     export_parser.add_argument("--file", required=True, help="Path to the input Excel file.")
     export_parser.set_defaults(func=_run_export)
 
     import_parser = subparsers.add_parser("import", help="Import accounts from JSON.")
-    import_parser.add_argument("--myidtravel", help="Path to myidtravel accounts JSON.")
-    import_parser.add_argument("--stafftraveler", help="Path to stafftraveler accounts JSON.")
+    import_parser.add_argument("--myidtravel", help="Path to myidtravel accounts JSON or NDJSON.")
+    import_parser.add_argument("--stafftraveler", help="Path to stafftraveler accounts JSON or NDJSON.")
     import_parser.add_argument("--truncate", action="store_true", help="Delete existing rows before import.")
     import_parser.set_defaults(func=_run_import)
 
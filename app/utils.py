@@ -1,4 +1,5 @@
 import json
+import re
 from datetime import datetime
 from typing import Any
 
@@ -39,26 +40,29 @@ def extract_json_from_text(text: str) -> Any:
     return None
 
 
+# Same grammar as strptime's "%I:%M %p" on the whole string, so annotated values like "10:05 AM+1" are rejected.
+_TIME_RE = re.compile(r"(1[0-2]|0[1-9]|[1-9]):([0-5]\d|\d)\s+(am|pm)", re.IGNORECASE)
+
+
 def normalize_google_time(time_str: str | None) -> str | None:
     if not time_str:
         return None
-    try:
-        cleaned = time_str.replace("\u202f", " ").strip()
-        return datetime.strptime(cleaned, "%I:%M %p").strftime("%H:%M")
-    except (ValueError, TypeError):
+    match = _TIME_RE.fullmatch(time_str.replace("\u202f", " ").strip())
+    if not match:
         return None
+    hour, minute, meridiem = int(match[1]), int(match[2]), match[3].lower()
+    if meridiem == "pm" and hour != 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    return f"{hour:02d}:{minute:02d}"
 
 
 def to_minutes(duration_str: str | None) -> int:
     if not duration_str:
         return 1440
     try:
-        clean = (
-            duration_str.lower()
-            .replace("hr", "h")
-            .replace("min", "m")
-            .replace(" ", "")
-        )
+        clean = duration_str.lower().replace("hr", "h").replace("min", "m").replace(" ", "")
         h = int(clean.split("h")[0]) if "h" in clean else 0
         m_part = clean.split("h")[-1] if "h" in clean else clean
         m = int(m_part.replace("m", "")) if "m" in m_part else 0
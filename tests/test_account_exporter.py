@@ -0,0 +1,72 @@
+import datetime
+
+import orjson
+import xlsxwriter
+
+from app.tools.account_exporter import AccountExporter
+
+
+def _write_flight_master(path):
+    workbook = xlsxwriter.Workbook(str(path))
+    sheet = workbook.add_worksheet()
+    date_format = workbook.add_format({"num_format": "dd/mm/yyyy"})
+    sheet.write(0, 0, "Flight master export")
+    sheet.write_row(1, 0, [f"col{idx}" for idx in range(47)])
+    # A full account: numeric username, a date-typed DOB and a multi-line text DOB cell.
+    sheet.write_row(2, 0, [" Jane Doe ", None, 12345, "pw1", None, None, "F", "SFO", "Pilot"])
+    sheet.write(2, 21, "John Doe (father)")
+    sheet.write_datetime(2, 22, datetime.datetime(1955, 3, 4), date_format)
+    sheet.write(2, 45, "Kid One\nKid Two [adopted]")
+    sheet.write(2, 46, "2010-01-02\n2012-05-06")
+    # Empty optional cells, then a fully blank row.
+    sheet.write_row(3, 0, ["Sam Roe", None, "sroe", "pw2"])
+    sheet.write(3, 25, "Pat Roe")
+    sheet.write_datetime(3, 26, datetime.datetime(1960, 12, 31), date_format)
+    sheet.write(5, 0, "Lee Poe")
+    sheet.write(5, 2, "lpoe")
+    sheet.write(5, 3, "pw3")
+    workbook.close()
+
+
+def test_export_flight_master_matches_pandas_output(tmp_path):
+    source = tmp_path / "flight-master.xlsx"
+    _write_flight_master(source)
+
+    output = AccountExporter(output_dir=str(tmp_path)).export_flight_master(str(source))
+    records = [orjson.loads(line) for line in output.read_bytes().splitlines()]
+
+    # Same as the old pandas.read_excel export, except that pandas stringified empty cells to "nan" (the exporter
+    # writes "") and kept the blank row as an all-"nan" record.
+    assert records == [
+        {
+            "employee": "Jane Doe",
+            "username": "12345",
+            "password": "pw1",
+            "gender": "F",
+            "airport": "SFO",
+            "position": "Pilot",
+            "travellers": [
+                {"name": "John Doe", "birthday": "1955-03-04 00:00:00", "relationship": "Parent 1"},
+                {"name": "Kid One", "birthday": "2010-01-02", "relationship": "Children"},
+                {"name": "Kid Two", "birthday": "2012-05-06", "relationship": "Children"},
+            ],
+        },
+        {
+            "employee": "Sam Roe",
+            "username": "sroe",
+            "password": "pw2",
+            "gender": "",
+            "airport": "",
+            "position": "",
+            "travellers": [{"name": "Pat Roe", "birthday": "1960-12-31 00:00:00", "relationship": "Parent 2"}],
+        },
+        {
+            "employee": "Lee Poe",
+            "username": "lpoe",
+            "password": "pw3",
+            "gender": "",
+            "airport": "",
+            "position": "",
+            "travellers": [],
+        },
+    ]
@@ -0,0 +1,44 @@
+import copy
+
+import pytest
+
+from app.bots import myidtravel_bot
+
+ROUTINGS = [
+    {
+        "routingId": 1,
+        "flights": [
+            {"flightNumber": "UA 1", "selectable": True},
+            {"flightNumber": "UA 2", "selectable": False},
+            {"flightNumber": "UA 3", "selectable": "true"},
+            {"flightNumber": "UA 4"},
+            "not a flight",
+        ],
+    },
+    {"routingId": 2, "flights": None},
+    {"routingId": 3},
+    "not a routing",
+]
+
+EXPECTED = [
+    {"routingId": 1, "flights": [{"flightNumber": "UA 1", "selectable": True}]},
+    {"routingId": 2, "flights": []},
+    {"routingId": 3, "flights": []},
+]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"routings": ROUTINGS, "requestId": "abc"}, ROUTINGS],
+    ids=["dict", "list"],
+)
+def test_filter_routings_keeps_selectable_flights(payload):
+    original = copy.deepcopy(payload)
+
+    assert myidtravel_bot._filter_routings(payload) == EXPECTED
+    assert payload == original
+
+
+@pytest.mark.parametrize("payload", [{}, {"routings": None}, []], ids=["no-routings", "null-routings", "empty-list"])
+def test_filter_routings_without_routings(payload):
+    assert myidtravel_bot._filter_routings(payload) == []
@@ -0,0 +1,39 @@
+from io import BytesIO
+
+from python_calamine import CalamineWorkbook
+
+from app.routes.runs import _build_excel
+
+
+def _read_sheets(payload: bytes) -> dict[str, list[list]]:
+    workbook = CalamineWorkbook.from_filelike(BytesIO(payload))
+    return {name: workbook.get_sheet_by_name(name).to_python() for name in workbook.sheet_names}
+
+
+def test_build_excel_mixed_key_rows():
+    rows = [
+        {"flight": "UA 1", "seats": 3},
+        {"seats": 5.5, "route": ["SFO", "ORD"], "flight": "UA 2"},
+        {"note": None, "flight": "UA 3", "meta": {"a": 1}, "ok": True},
+    ]
+
+    sheets = _read_sheets(_build_excel({"Flights": rows}))
+
+    assert sheets["Flights"] == [
+        # Every key, in order of first appearance across the rows.
+        ["flight", "seats", "route", "note", "meta", "ok"],
+        # Missing keys and None are empty cells; nested values are stringified.
+        ["UA 1", 3, "", "", "", ""],
+        ["UA 2", 5.5, "['SFO', 'ORD']", "", "", ""],
+        ["UA 3", "", "", "", "{'a': 1}", True],
+    ]
+
+
+def test_build_excel_sheet_names_and_literal_strings():
+    long_name = "Stafftraveler flight loads report"
+
+    sheets = _read_sheets(_build_excel({"Empty": [], long_name: [{"formula": "=1+1", "link": "https://x.test"}]}))
+
+    assert list(sheets) == ["Empty", long_name[:31]]
+    assert sheets["Empty"] == []
+    assert sheets[long_name[:31]] == [["formula", "link"], ["=1+1", "https://x.test"]]
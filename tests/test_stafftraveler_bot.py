@@ -0,0 +1,95 @@
+import pytest
+
+from app.bots import stafftraveler_bot
+
+GROUP_HTML = """
+<div class="css-1y0bycm">
+  <div class="css-1vdvsal"><p>20 Oct 2026</p><p>Tuesday</p></div>
+  <div class="css-1yt60yy">
+    <img alt="United Airlines Logo" src="ua.png">
+    <p class="css-zvlevn">United Airlines</p>
+    <p class="css-1nthn72">UA 123</p>
+    <div class="css-15x0uos"><p class="chakra-text">Boeing 737-900</p></div>
+    <div class="css-1g1rqrm"><p>08:15</p><p>11:40</p></div>
+    <div class="css-wib9zn"><p>SFO</p><p>ORD</p></div>
+    <div class="css-phz870"><p>Nonstop</p><p>4h 25m</p></div>
+  </div>
+  <div class="css-1yt60yy">
+    <img alt="Lufthansa" src="lh.png">
+    <p class="css-1nthn72">LH 455</p>
+    <div class="css-1g1rqrm"><p>15:50</p><p></p></div>
+    <div class="css-wib9zn"><p>SFO</p></div>
+  </div>
+</div>
+"""
+
+
+@pytest.fixture(autouse=True)
+def _empty_card_selector_cache():
+    stafftraveler_bot._card_selector_cache.clear()
+    yield
+    stafftraveler_bot._card_selector_cache.clear()
+
+
+def test_parse_result_group_extracts_flight_fields():
+    group, card_selector = stafftraveler_bot._parse_result_group(GROUP_HTML)
+
+    assert card_selector == ".css-1yt60yy"
+    assert group["flight_date"] == "20 Oct 2026"
+    assert group["day"] == "Tuesday"
+    assert group["flight_details"] == [
+        {
+            "airlines": "United Airlines",
+            "aircraft": "Boeing 737-900",
+            "airline_flight_number": "UA 123",
+            "origin": "SFO",
+            "destination": "ORD",
+            "time": "08:15 - 11:40",
+            "duration": "4h 25m",
+        },
+        {
+            "airlines": "Lufthansa",
+            "aircraft": "",
+            "airline_flight_number": "LH 455",
+            "origin": "SFO",
+            "destination": "",
+            "time": "15:50",
+            "duration": "",
+        },
+    ]
+
+
+def test_parse_result_group_without_cards():
+    group, _ = stafftraveler_bot._parse_result_group('<div class="css-1y0bycm"></div>')
+
+    assert group == {"flight_date": "", "day": "", "flight_details": []}
+
+
+def test_resolve_card_selector_discovers_rehashed_cards():
+    rehashed = (
+        GROUP_HTML.replace("css-1y0bycm", "css-9newrot")
+        .replace("css-1vdvsal", "css-9newhdr")
+        .replace("css-1yt60yy", "css-9newcard extra")
+    )
+
+    group, card_selector = stafftraveler_bot._parse_result_group(rehashed)
+
+    assert card_selector == ".css-9newcard"
+    assert [flight["airline_flight_number"] for flight in group["flight_details"]] == ["UA 123", "LH 455"]
+    assert list(stafftraveler_bot._card_selector_cache.values()) == [".css-9newcard"]
+
+
+def test_resolve_card_selector_reuses_cached_layout(monkeypatch):
+    _, first = stafftraveler_bot._parse_result_group(GROUP_HTML)
+
+    def _fail(_group):
+        raise AssertionError("a cached layout must not be rediscovered")
+
+    monkeypatch.setattr(stafftraveler_bot, "_discover_card_selector", _fail)
+    # Same container and header classes with a different number of cards: still a cache hit.
+    one_card = GROUP_HTML[: GROUP_HTML.index('<div class="css-1yt60yy">\n    <img alt="Lufthansa"')] + "</div>"
+    group, second = stafftraveler_bot._parse_result_group(one_card)
+
+    assert first == second == ".css-1yt60yy"
+    assert len(group["flight_details"]) == 1
+    assert len(stafftraveler_bot._card_selector_cache) == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from app.utils import normalize_google_time, to_minutes
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("10:05 AM", "10:05"),
+        ("07:45 am", "07:45"),
+        ("12:00 AM", "00:00"),
+        ("12:30 pm", "12:30"),
+        ("9:5 PM", "21:05"),
+        (" 7:45  PM ", "19:45"),
+        ("7:45 PM", "19:45"),
+        ("10:05 AM+1", None),
+        ("0:30 PM", None),
+        ("13:00 PM", None),
+        ("1:60 AM", None),
+        ("09:15PM", None),
+        ("Departs at 9:15 PM on Mon", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_normalize_google_time(raw, expected):
+    assert normalize_google_time(raw) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("1 hr 30 min", 90),
+        ("2 hr", 120),
+        ("45 min", 45),
+        ("90", 0),
+        ("45 minutes", 1440),
+        ("", 1440),
+        (None, 1440),
+    ],
+)
+def test_to_minutes(raw, expected):
+    assert to_minutes(raw) == expected